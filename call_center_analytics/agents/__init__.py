@@ -5,6 +5,7 @@ from agents.call_intake_agent import CallIntakeAgent
 from agents.transcription_agent import TranscriptionAgent
 from agents.summarization_agent import SummarizationAgent
 from agents.quality_scoring_agent import QualityScoringAgent
+from agents.analysis_agent import AnalysisAgent
 from agents.data_storage_agent import DataStorageAgent
 from agents.workflow import CallCenterWorkflow
 
@@ -13,6 +14,7 @@ __all__ = [
     'TranscriptionAgent',
     'SummarizationAgent',
     'QualityScoringAgent',
+    'AnalysisAgent',
     'DataStorageAgent',
     'CallCenterWorkflow'
 ]
@@ -0,0 +1,496 @@
+"""
+Analysis Agent - Generates summary AND quality score in a single LLM call.
+"""
+from typing import Dict, Any, Iterator, List, Optional, Union
+from langchain_core.utils.json import parse_partial_json
+from langchain.prompts import ChatPromptTemplate
+from utils.parsers import OrjsonPydanticParser
+from utils.config import Config
+from utils.models import BatchAnalysisResult, CallAnalysis, CallSummary, CallData
+from utils.batch import build_chat_request, run_chat_batch
+from utils.llm import shared_chat_llm, shared_openai_client
+from utils.result_cache import ResultCache, result_key
+
+try:
+    import tiktoken
+    _ENC = tiktoken.encoding_for_model(Config.GPT_MODEL)
+except Exception:  # unknown model name or tiktoken unavailable
+    _ENC = None
+
+# Prefill tokens dominate LLM latency and cost, and very long transcripts can
+# exhaust the per-minute token budget. Cap the conversation at roughly this
+# many tokens, keeping the head and tail (greeting/issue and resolution carry
+# most of the signal) with the middle elided.
+_TOKEN_BUDGET = 3000
+_CHAR_BUDGET = 12000  # fallback when no tokenizer: ~4 chars per token
+
+
+def truncate_conversation(conversation: str) -> str:
+    """
+    Trim an over-budget conversation to head + tail with an elided middle.
+
+    Args:
+        conversation: Full conversation text
+
+    Returns:
+        The conversation unchanged if within budget, otherwise a truncated
+        version with an elision marker
+    """
+    if _ENC is not None:
+        tokens = _ENC.encode(conversation)
+        if len(tokens) <= _TOKEN_BUDGET:
+            return conversation
+        half = _TOKEN_BUDGET // 2
+        head = _ENC.decode(tokens[:half])
+        tail = _ENC.decode(tokens[-half:])
+        return f"{head}\n...[{len(tokens) - 2 * half} tokens elided]...\n{tail}"
+
+    if len(conversation) <= _CHAR_BUDGET:
+        return conversation
+    half = _CHAR_BUDGET // 2
+    return (
+        f"{conversation[:half]}\n...[transcript middle elided]...\n"
+        f"{conversation[-half:]}"
+    )
+
+
+# Task instructions shared by the single-call and batched prompts below.
+ANALYSIS_TASKS_SECTION = """TASK 1 - SUMMARY:
+1. A brief summary (2-3 sentences) of the overall call
+2. Key points discussed in the conversation
+3. The main customer issue or request
+4. How the issue was resolved (if applicable)
+5. Any action items or follow-ups needed
+
+TASK 2 - QUALITY EVALUATION:
+SCORING RUBRIC (0-10 scale for each criterion):
+
+1. TONE AND EMPATHY (0-10):
+   - 9-10: Consistently warm, empathetic, and understanding throughout
+   - 7-8: Generally positive tone with good empathy
+   - 5-6: Neutral tone, adequate empathy
+   - 3-4: Occasionally cold or dismissive
+   - 0-2: Consistently poor tone, lacking empathy
+
+2. PROFESSIONALISM (0-10):
+   - 9-10: Excellent communication skills, proper grammar, courteous language
+   - 7-8: Professional with minor lapses
+   - 5-6: Adequate professionalism
+   - 3-4: Several unprofessional moments
+   - 0-2: Unprofessional behavior or language
+
+3. PROBLEM RESOLUTION / CALL EFFECTIVENESS (0-10):
+   CONTEXT-AWARE SCORING:
+
+   For calls WITH a problem/issue:
+   - 9-10: Issue fully resolved, customer clearly satisfied
+   - 7-8: Issue resolved with minor follow-up needed
+   - 5-6: Partial resolution or unclear outcome
+   - 3-4: Issue not adequately addressed
+   - 0-2: No resolution or made situation worse
+
+   For calls WITHOUT a problem (informational, inquiry, status check):
+   - 9-10: Question fully answered, information clearly provided, customer satisfied
+   - 7-8: Question answered with minor gaps or needed clarification
+   - 5-6: Adequate response but could be more complete
+   - 3-4: Incomplete or unclear information provided
+   - 0-2: Failed to address the inquiry or provided incorrect information
+
+   NOTE: If there was NO issue or problem to resolve, focus on how effectively the agent
+   handled the inquiry, provided information, or addressed the customer's needs.
+
+4. RESPONSE APPROPRIATENESS (0-10):
+   - 9-10: All responses relevant, clear, and helpful
+   - 7-8: Mostly appropriate responses
+   - 5-6: Some responses could be improved
+   - 3-4: Several inappropriate or unclear responses
+   - 0-2: Consistently poor or off-topic responses
+
+For the quality evaluation provide:
+1. Individual scores for each criterion (0-10)
+2. Overall score (average of all criteria, 0-10)
+3. Detailed feedback explaining the scores
+4. List of strengths demonstrated
+5. List of areas for improvement
+
+IMPORTANT: Adapt your scoring to the call type. Not all calls have problems to solve -
+some are informational, transactional, or proactive. Score based on effectiveness.
+If the call genuinely cannot be scored, set quality_score to null."""
+
+
+# Combined summarization + quality scoring prompt. The conversation is the
+# bulk of the prefill tokens, so interpolating it once instead of twice
+# (summary call + scoring call) halves LLM cost and latency per call.
+COMBINED_ANALYSIS_TEMPLATE = """You are an expert call center analyst. Analyze the following call transcript and provide BOTH a comprehensive summary AND a quality evaluation.
+
+Call Metadata:
+- Call ID: {call_id}
+- Caller: {caller_name}
+- Agent: {agent_name}
+- Duration: {duration}
+- Date/Time: {date_time}
+
+Conversation:
+{conversation}
+
+""" + ANALYSIS_TASKS_SECTION + """
+
+{format_instructions}
+"""
+
+
+# Batched variant for bulk/backfill runs: packs several calls into one
+# request so the task instructions and schema are paid for once per batch
+# instead of once per call.
+BATCH_ANALYSIS_TEMPLATE = """You are an expert call center analyst. Analyze EACH of the following calls independently and provide BOTH a comprehensive summary AND a quality evaluation for every one.
+
+{calls}
+
+For EACH call, perform the two tasks below.
+
+""" + ANALYSIS_TASKS_SECTION + """
+
+Return one analysis per call, each tagged with the call_index from its
+=== CALL N === header.
+
+{format_instructions}
+"""
+
+
+class AnalysisAgent:
+    """
+    Agent responsible for generating the call summary and quality score
+    together, using a SINGLE LLM call instead of two sequential ones.
+    """
+
+    def __init__(self):
+        self.name = "Analysis Agent"
+        self.llm = shared_chat_llm()
+        self.output_parser = OrjsonPydanticParser(pydantic_object=CallAnalysis)
+        self.batch_parser = OrjsonPydanticParser(pydantic_object=BatchAnalysisResult)
+        # Prompt templates and format instructions are invariant - build once
+        self._prompt = ChatPromptTemplate.from_template(COMBINED_ANALYSIS_TEMPLATE)
+        self._fmt = self.output_parser.get_format_instructions()
+        self._batch_prompt = ChatPromptTemplate.from_template(BATCH_ANALYSIS_TEMPLATE)
+        self._batch_fmt = self.batch_parser.get_format_instructions()
+        # Parsed analyses keyed by conversation content + model: replays and
+        # near-duplicate uploads skip the LLM round trip entirely
+        self._result_cache = ResultCache(maxsize=1024)
+
+    def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Process call data and generate summary plus quality score.
+
+        Args:
+            state: Current agent state containing call_data
+
+        Returns:
+            Updated state with summary and quality_score
+        """
+        try:
+            call_data = state.get("call_data")
+
+            if not call_data:
+                return {"error": "No call data available for analysis"}
+
+            analysis = self._analyze(call_data)
+            return self._merge_analysis(state, analysis)
+
+        except Exception as e:
+            return {"error": f"Analysis Agent error: {str(e)}"}
+
+    async def aprocess(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Async variant of process() using ainvoke.
+
+        Lets a batch caller overlap the analysis LLM calls of many states
+        via asyncio.gather instead of serializing the network round trips.
+
+        Args:
+            state: Current agent state containing call_data
+
+        Returns:
+            Updated state with summary and quality_score
+        """
+        try:
+            call_data = state.get("call_data")
+
+            if not call_data:
+                return {"error": "No call data available for analysis"}
+
+            key = result_key(call_data.conversation, Config.GPT_MODEL)
+            analysis = self._result_cache.get(key)
+            if analysis is None:
+                response = await self.llm.ainvoke(self._build_messages(call_data))
+                analysis = self._parse_response(response.content, call_data)
+                # Unscored results come from parse failures - don't pin
+                # them in the cache, a retry may well produce a score
+                if analysis.quality_score is not None:
+                    self._result_cache.put(key, analysis)
+            return self._merge_analysis(state, analysis)
+
+        except Exception as e:
+            return {"error": f"Analysis Agent error: {str(e)}"}
+
+    def _merge_analysis(self, state: Dict[str, Any], analysis: CallAnalysis) -> Dict[str, Any]:
+        """
+        Turn a parsed analysis into a state delta, flagging unscored calls.
+
+        Args:
+            state: Current agent state (unused beyond signature symmetry)
+            analysis: Parsed CallAnalysis
+
+        Returns:
+            State delta (LangGraph merges it into the full state)
+        """
+        if analysis.quality_score is None:
+            # Scoring failed - mark for manual review
+            return {
+                "summary": analysis.summary,
+                "quality_score": None,
+                "needs_manual_review": True,
+                "processing_steps": [
+                    "Analysis: Summary generated; scoring incomplete - call saved for manual review"
+                ]
+            }
+
+        return {
+            "summary": analysis.summary,
+            "quality_score": analysis.quality_score,
+            "processing_steps": ["Analysis: Summary generated and call quality evaluated"]
+        }
+
+    def process_batch(
+        self, states: List[Dict[str, Any]], batch_size: int = 6
+    ) -> List[Dict[str, Any]]:
+        """
+        Analyze many states with packed multi-call prompts.
+
+        For bulk/backfill runs, packing several conversations into one
+        request amortizes the task instructions and output schema across
+        the batch, cutting prompt-token overhead roughly by the batch
+        size. Any call the batched response misses (or a batch that fails
+        to parse) falls back to the single-call path, so error isolation
+        matches per-call processing.
+
+        Args:
+            states: Agent states, each containing call_data
+            batch_size: Calls packed per prompt (kept small for context
+                and error-isolation reasons)
+
+        Returns:
+            List of updated states in input order
+        """
+        results = []
+        for start in range(0, len(states), batch_size):
+            results.extend(self._process_group(states[start:start + batch_size]))
+        return results
+
+    def _process_group(self, group: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Analyze one packed group of states, falling back per call."""
+        # States without call_data take the single-call path (error handling)
+        valid = [(pos, state) for pos, state in enumerate(group) if state.get("call_data")]
+
+        by_pos: Dict[int, CallAnalysis] = {}
+        if len(valid) > 1:
+            blocks = []
+            for index, (_, state) in enumerate(valid, start=1):
+                call_data = state["call_data"]
+                blocks.append(
+                    f"=== CALL {index} ===\n"
+                    f"Call ID: {call_data.metadata.call_id or 'N/A'}\n"
+                    f"Caller: {call_data.metadata.caller_name or 'Unknown'}\n"
+                    f"Agent: {call_data.metadata.agent_name or 'Unknown'}\n"
+                    f"Duration: {call_data.metadata.call_duration or 'N/A'}\n"
+                    f"Conversation:\n{truncate_conversation(call_data.conversation)}"
+                )
+
+            try:
+                messages = self._batch_prompt.format_messages(
+                    calls="\n\n".join(blocks),
+                    format_instructions=self._batch_fmt
+                )
+                response = self.llm.invoke(messages)
+                result = self.batch_parser.parse(response.content)
+                for item in result.analyses:
+                    if 1 <= item.call_index <= len(valid):
+                        pos = valid[item.call_index - 1][0]
+                        by_pos[pos] = CallAnalysis(
+                            summary=item.summary,
+                            quality_score=item.quality_score
+                        )
+            except Exception:
+                # Batch request or parse failed - every call falls back
+                by_pos = {}
+
+        return [
+            self._merge_analysis(state, by_pos[pos]) if pos in by_pos else self.process(state)
+            for pos, state in enumerate(group)
+        ]
+
+    def process_batch_offline(
+        self, states: List[Dict[str, Any]], poll_interval: int = 30
+    ) -> List[Dict[str, Any]]:
+        """
+        Analyze many states through the OpenAI Batch API.
+
+        For large historical reprocessing jobs, the Batch API is ~50%
+        cheaper than synchronous calls and does not count against online
+        rate limits, at the cost of up to a 24h completion window. Each
+        state becomes one chat-completion request; responses are parsed
+        with the same parser and fallback as the synchronous path. Falls
+        back to process() per state if the batch submission fails.
+
+        Args:
+            states: Agent states, each containing call_data
+            poll_interval: Seconds between batch status polls
+
+        Returns:
+            List of updated states in input order
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(states)
+        pending = {}  # custom_id -> (index, state)
+        request_lines = []
+
+        for i, state in enumerate(states):
+            call_data = state.get("call_data")
+            if not call_data:
+                state["error"] = "No call data available for analysis"
+                results[i] = state
+                continue
+
+            custom_id = f"analysis-{i}"
+            pending[custom_id] = (i, state)
+            prompt = COMBINED_ANALYSIS_TEMPLATE.format(
+                call_id=call_data.metadata.call_id or "N/A",
+                caller_name=call_data.metadata.caller_name or "Unknown",
+                agent_name=call_data.metadata.agent_name or "Unknown",
+                duration=call_data.metadata.call_duration or "N/A",
+                date_time=call_data.metadata.date_time or "N/A",
+                conversation=truncate_conversation(call_data.conversation),
+                format_instructions=self._fmt
+            )
+            request_lines.append(build_chat_request(
+                custom_id, prompt, Config.GPT_MODEL, temperature=Config.TEMPERATURE
+            ))
+
+        if not pending:
+            return results
+
+        try:
+            responses = run_chat_batch(shared_openai_client(), request_lines, poll_interval)
+        except Exception as e:
+            # Batch submission failed - fall back to synchronous processing
+            print(f"Batch analysis failed ({e}); falling back to synchronous processing")
+            for i, state in pending.values():
+                results[i] = self.process(state)
+            return results
+
+        for custom_id, (i, state) in pending.items():
+            content = responses.get(custom_id)
+            if content is None:
+                state["error"] = "Analysis Agent error: no response in batch output"
+                results[i] = state
+                continue
+            analysis = self._parse_response(content, state["call_data"])
+            results[i] = self._merge_analysis(state, analysis)
+
+        return results
+
+    def _analyze(self, call_data: CallData) -> CallAnalysis:
+        """
+        Generate summary and quality score in one LLM call.
+
+        Args:
+            call_data: CallData object containing conversation
+
+        Returns:
+            CallAnalysis with summary and (optionally) quality score
+        """
+        key = result_key(call_data.conversation, Config.GPT_MODEL)
+        analysis = self._result_cache.get(key)
+        if analysis is None:
+            response = self.llm.invoke(self._build_messages(call_data))
+            analysis = self._parse_response(response.content, call_data)
+            # Unscored results come from parse failures - don't pin them
+            # in the cache, a retry may well produce a score
+            if analysis.quality_score is not None:
+                self._result_cache.put(key, analysis)
+        return analysis
+
+    def stream_analysis(
+        self, call_data: CallData, parse_every: int = 16
+    ) -> Iterator[Union[Dict[str, Any], CallAnalysis]]:
+        """
+        Stream the analysis, yielding partial results as tokens arrive.
+
+        Intermediate yields are best-effort dicts recovered from the
+        incomplete JSON (e.g. the summary fields fill in before the quality
+        scores), so a UI can render progress instead of waiting for the
+        full response. The final yield is always the complete CallAnalysis.
+
+        Args:
+            call_data: CallData object containing conversation
+            parse_every: Re-parse the partial JSON every N chunks
+
+        Yields:
+            Partial dicts, then a final CallAnalysis
+        """
+        buffer = []
+        for i, chunk in enumerate(self.llm.stream(self._build_messages(call_data))):
+            if not chunk.content:
+                continue
+            buffer.append(chunk.content)
+            if i % parse_every == 0:
+                try:
+                    partial = parse_partial_json("".join(buffer))
+                except Exception:
+                    partial = None
+                if isinstance(partial, dict):
+                    yield partial
+
+        yield self._parse_response("".join(buffer), call_data)
+
+    def _build_messages(self, call_data: CallData):
+        """Format the combined analysis prompt for one call."""
+        return self._prompt.format_messages(
+            call_id=call_data.metadata.call_id or "N/A",
+            caller_name=call_data.metadata.caller_name or "Unknown",
+            agent_name=call_data.metadata.agent_name or "Unknown",
+            duration=call_data.metadata.call_duration or "N/A",
+            date_time=call_data.metadata.date_time or "N/A",
+            conversation=truncate_conversation(call_data.conversation),
+            format_instructions=self._fmt
+        )
+
+    def _parse_response(self, content: str, call_data: CallData) -> CallAnalysis:
+        """Parse the LLM response, falling back to a minimal unscored result."""
+        try:
+            return self.output_parser.parse(content)
+        except Exception:
+            # Fallback: minimal summary, no score (routes to manual review)
+            return CallAnalysis(
+                summary=self._create_fallback_summary(call_data),
+                quality_score=None
+            )
+
+    def _create_fallback_summary(self, call_data: CallData) -> CallSummary:
+        """
+        Create a minimal summary when structured parsing fails.
+
+        Args:
+            call_data: Original call data
+
+        Returns:
+            CallSummary object
+        """
+        return CallSummary(
+            brief_summary=(
+                f"Call between {call_data.metadata.caller_name or 'customer'} "
+                f"and {call_data.metadata.agent_name or 'agent'}."
+            ),
+            key_points=["Call summary unavailable - structured data could not be extracted"],
+            customer_issue=None,
+            resolution=None,
+            action_items=[]
+        )
@@ -1,14 +1,29 @@
 """
 Data Storage Agent - Stores call data and quality scores for analytics.
 """
-import json
 import csv
 import os
+import atexit
+import bisect
+import functools
+import uuid
+import orjson
+import sqlite3
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 from pathlib import Path
+import numpy as np
 import pandas as pd
-from utils.models import CallData, CallSummary, QualityScore
+from utils.models import CallData
+
+# Optional fast path: pyarrow's CSV reader is multithreaded and parses a
+# large scores file several times faster than pd.read_csv
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = None
+    pacsv = None
 
 
 class DataStorageAgent:
@@ -16,55 +31,203 @@ class DataStorageAgent:
     Agent responsible for persisting call data, summaries, and quality scores
     to various data stores for analytics and agent evaluation.
     """
-    
+
+    # Column order for quality_scores.csv
+    SCORE_FIELDS = [
+        'timestamp', 'call_id', 'agent_name', 'caller_name',
+        'call_duration', 'overall_score', 'tone_score',
+        'professionalism_score', 'resolution_score', 'response_score',
+        'feedback', 'strengths', 'areas_for_improvement'
+    ]
+
+    # Default projection for analytics reads: the long free-text columns
+    # (feedback, strengths, areas_for_improvement) are most of the row bytes
+    # and are rarely needed for score analytics
+    SCORE_ANALYTICS_COLUMNS = [
+        'timestamp', 'call_id', 'agent_name', 'overall_score', 'tone_score',
+        'professionalism_score', 'resolution_score', 'response_score'
+    ]
+    SCORE_DTYPES = {
+        'call_id': 'string',
+        'agent_name': 'category',
+        'overall_score': 'float32',
+        'tone_score': 'float32',
+        'professionalism_score': 'float32',
+        'resolution_score': 'float32',
+        'response_score': 'float32'
+    }
+
     def __init__(self, storage_dir: str = "data_storage_call_center"):
         """
-        Initialize the Data Storage Agent.
-        
+        Bind this instance to the shared per-directory storage state.
+
+        The workflow's storage node and the Streamlit page each construct
+        their own DataStorageAgent; sharing one prototype per storage
+        directory means both see the same in-memory stats, the same
+        buffered scores writer and the same SQLite handle - a score
+        written through one instance is immediately visible to reads
+        through the other.
+
         Args:
             storage_dir: Directory where data will be stored
         """
-        self.name = "Data Storage Agent"
-        self.storage_dir = Path(storage_dir)
-        
+        self.__dict__.update(type(self)._shared(storage_dir).__dict__)
+
+    @classmethod
+    @functools.cache
+    def _shared(cls, storage_dir: str) -> "DataStorageAgent":
+        """
+        Build the storage state exactly once per directory and process.
+
+        Args:
+            storage_dir: Directory where data will be stored
+
+        Returns:
+            The fully initialized prototype instance
+        """
+        prototype = object.__new__(cls)
+        prototype.name = "Data Storage Agent"
+        prototype.storage_dir = Path(storage_dir)
+
         # Create storage directories
-        self.storage_dir.mkdir(exist_ok=True)
-        (self.storage_dir / "calls").mkdir(exist_ok=True)
-        (self.storage_dir / "scores").mkdir(exist_ok=True)
-        (self.storage_dir / "reports").mkdir(exist_ok=True)
-        
+        prototype.storage_dir.mkdir(exist_ok=True)
+        (prototype.storage_dir / "calls").mkdir(exist_ok=True)
+        (prototype.storage_dir / "scores").mkdir(exist_ok=True)
+        (prototype.storage_dir / "reports").mkdir(exist_ok=True)
+
         # File paths
-        self.calls_db = self.storage_dir / "calls_database.json"
-        self.scores_csv = self.storage_dir / "quality_scores.csv"
-        self.agent_performance_csv = self.storage_dir / "agent_performance.csv"
-        
+        prototype.calls_db = prototype.storage_dir / "calls_database.json"  # legacy, migrated
+        prototype.calls_index = prototype.storage_dir / "calls_index.jsonl"  # legacy, migrated
+        prototype.scores_csv = prototype.storage_dir / "quality_scores.csv"
+        prototype.agent_performance_csv = prototype.storage_dir / "agent_performance.csv"
+        prototype.agent_performance_json = prototype.storage_dir / "agent_performance.json"
+
         # Initialize storage files if they don't exist
-        self._initialize_storage()
+        prototype._initialize_storage()
+        return prototype
     
     def _initialize_storage(self):
         """Initialize storage files if they don't exist."""
-        # Initialize JSON database
-        if not self.calls_db.exists():
-            with open(self.calls_db, 'w') as f:
-                json.dump({"calls": []}, f, indent=2)
-        
+        # Open the SQLite index; inserts are single prepared statements and
+        # filtered listings become index seeks instead of full scans
+        self.conn = sqlite3.connect(
+            self.storage_dir / "calls.db",
+            isolation_level=None,
+            check_same_thread=False
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS calls(
+                call_id TEXT PRIMARY KEY,
+                timestamp TEXT,
+                agent_name TEXT,
+                overall_score REAL,
+                needs_manual_review INT,
+                status TEXT,
+                flagged_categories TEXT
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_calls_review ON calls(needs_manual_review)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_calls_agent ON calls(agent_name)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_calls_ts ON calls(timestamp)")
+        self._migrate_legacy_calls_db()
+
         # Initialize CSV files with headers
         if not self.scores_csv.exists():
             self._create_scores_csv()
-        
+
         if not self.agent_performance_csv.exists():
             self._create_agent_performance_csv()
+
+        # In-memory per-agent counters; updates touch this dict and a small
+        # JSON flush instead of re-reading and rewriting the whole CSV.
+        # The file mtime is tracked so reads can spot updates written by
+        # another process (e.g. a second Streamlit server worker)
+        self._agent_stats = self._load_agent_stats()
+        try:
+            self._agent_stats_mtime = os.path.getmtime(self.agent_performance_json)
+        except OSError:
+            self._agent_stats_mtime = 0.0
+
+        # Keep the scores CSV open across calls with a large buffer: each
+        # score append is a userspace copy instead of open/write/close
+        # syscalls per row
+        self._scores_fp = open(
+            self.scores_csv, 'a', buffering=64 * 1024, newline='', encoding='utf-8'
+        )
+        # Positional writer: rows go out as tuples already in SCORE_FIELDS
+        # order, skipping DictWriter's per-row dict-to-field projection
+        self._scores_writer = csv.writer(self._scores_fp)
+        atexit.register(self.close)
+
+    def close(self):
+        """Flush and close the persistent handles (scores CSV, calls index)."""
+        try:
+            if not self._scores_fp.closed:
+                self._scores_fp.close()
+        except Exception:
+            pass
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+
+    def _migrate_legacy_calls_db(self):
+        """
+        One-shot migration of the legacy JSON/JSONL call indexes to SQLite.
+        """
+        entries = []
+        try:
+            if self.calls_db.exists():
+                with open(self.calls_db, 'rb') as f:
+                    entries.extend(orjson.loads(f.read()).get("calls", []))
+            if self.calls_index.exists():
+                with open(self.calls_index, 'rb') as f:
+                    entries.extend(orjson.loads(line) for line in f if line.strip())
+
+            if entries:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO calls VALUES(?,?,?,?,?,?,?)",
+                    [self._index_row(entry) for entry in entries]
+                )
+            if self.calls_db.exists():
+                self.calls_db.unlink()
+            if self.calls_index.exists():
+                self.calls_index.unlink()
+        except Exception as e:
+            print(f"Warning: Could not migrate legacy calls database: {e}")
+
+    @staticmethod
+    def _index_row(entry: Dict[str, Any]) -> tuple:
+        """Convert an index entry dict to a calls-table row tuple."""
+        flagged = entry.get("flagged_categories")
+        return (
+            entry.get("call_id"),
+            entry.get("timestamp"),
+            entry.get("agent_name"),
+            entry.get("overall_score"),
+            1 if entry.get("needs_manual_review") else 0,
+            entry.get("status"),
+            orjson.dumps(flagged).decode("utf-8") if flagged else None
+        )
+
+    def _append_index_entry(self, entry: Dict[str, Any]):
+        """
+        Insert one entry into the calls index table.
+
+        Args:
+            entry: Index record for one call
+        """
+        self.conn.execute(
+            "INSERT OR REPLACE INTO calls VALUES(?,?,?,?,?,?,?)",
+            self._index_row(entry)
+        )
     
     def _create_scores_csv(self):
         """Create the quality scores CSV file with headers."""
-        headers = [
-            'timestamp', 'call_id', 'agent_name', 'caller_name',
-            'call_duration', 'overall_score', 'tone_score', 
-            'professionalism_score', 'resolution_score', 'response_score',
-            'feedback', 'strengths', 'areas_for_improvement'
-        ]
         with open(self.scores_csv, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=headers)
+            writer = csv.DictWriter(f, fieldnames=self.SCORE_FIELDS)
             writer.writeheader()
     
     def _create_agent_performance_csv(self):
@@ -98,25 +261,22 @@ class DataStorageAgent:
             quality_score = state.get("quality_score")
             needs_manual_review = state.get("needs_manual_review", False)
             content_safety_passed = state.get("content_safety_passed", True)
-            content_safety_details = state.get("content_safety_details", {})
-            
+            content_safety_details = state.get("content_safety_details") or {}
+
+            # One timestamp per call: avoids repeated clock reads and keeps
+            # every record written for this call on the same instant
+            now = datetime.now()
+
             # Handle content safety flagged items (may not have call_data yet)
             if not content_safety_passed:
-                return self._store_flagged_content(state)
+                return self._store_flagged_content(state, now)
             
             if not call_data:
-                return {
-                    **state,
-                    "processing_steps": ["Data Storage: Skipped - Missing call data"]
-                }
-                return {
-                    **state,
-                    "processing_steps": ["Data Storage: Skipped - Missing call data"]
-                }
+                return {"processing_steps": ["Data Storage: Skipped - Missing call data"]}
             
             # Generate unique call ID if not present
             if not call_data.metadata.call_id:
-                call_data.metadata.call_id = self._generate_call_id()
+                call_data.metadata.call_id = self._generate_call_id(now)
             
             # Check if agent name is missing (flag for manual review)
             has_agent_name = (call_data.metadata.agent_name and 
@@ -126,14 +286,20 @@ class DataStorageAgent:
                 # Mark for manual review if no agent name
                 needs_manual_review = True
             
+            # Dump the Pydantic models to plain dicts once at this boundary;
+            # every write below reads the dicts instead of re-walking model
+            # attribute descriptors per field
+            summary_dict = summary.model_dump() if summary else None
+            score_dict = quality_score.model_dump() if quality_score else None
+
             # Store complete call record (ALWAYS - even without agent name)
-            self._store_call_record(call_data, summary, quality_score, needs_manual_review)
-            
+            self._store_call_record(call_data, summary_dict, score_dict, needs_manual_review, now)
+
             # Only store quality score and update analytics if we have agent name and valid score
-            if has_agent_name and quality_score:
-                self._store_quality_score(call_data, quality_score)
+            if has_agent_name and score_dict:
+                self._store_quality_score(call_data, score_dict, now)
                 # Update agent performance analytics (only with valid scores)
-                self._update_agent_performance(call_data, quality_score)
+                self._update_agent_performance(call_data, score_dict, now)
             
             # Build success message
             if not has_agent_name:
@@ -143,44 +309,78 @@ class DataStorageAgent:
             else:
                 message = f"Data Storage: Call {call_data.metadata.call_id} stored successfully"
             
-            # Update state - return new list for operator.add
-            state["storage_path"] = str(self.storage_dir)
-            
+            # Return only the delta - the graph reducer merges it into state
+            # without copying the large transcript/conversation entries
             return {
-                **state,
+                "storage_path": str(self.storage_dir),
                 "processing_steps": [message]
             }
-            
+
         except Exception as e:
-            state["error"] = f"Data Storage Agent error: {str(e)}"
-            return state
+            return {"error": f"Data Storage Agent error: {str(e)}"}
     
-    def _generate_call_id(self) -> str:
+    def process_batch(self, states: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Store many calls under a single index transaction and one flush.
+
+        When importing a backlog, the per-call fsync cost dominates; a
+        wrapping BEGIN/COMMIT lets SQLite commit all index inserts at once
+        and the scores CSV is flushed once at the end.
+
+        Args:
+            states: List of agent states to store
+
+        Returns:
+            List of updated states in the same order
+        """
+        if not states:
+            return []
+
+        self.conn.execute("BEGIN")
+        try:
+            results = [self.process(state) for state in states]
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+        if not self._scores_fp.closed:
+            self._scores_fp.flush()
+
+        return results
+
+    def _generate_call_id(self, now: datetime) -> str:
         """Generate a unique call ID."""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        return f"CALL_{timestamp}"
-    
-    def _store_flagged_content(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        # The timestamp alone has one-second resolution; concurrent batch
+        # runs routinely finish in the same second, and colliding IDs
+        # silently overwrite each other's record blob and index row
+        return f"CALL_{now.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+
+    def _store_flagged_content(self, state: Dict[str, Any], now: datetime) -> Dict[str, Any]:
         """
         Store content that failed content safety checks for manual review.
-        
+
         Args:
             state: Current state with transcript and content safety details
-            
+            now: Timestamp shared by all records for this call
+
         Returns:
             Updated state with storage confirmation
         """
         transcript = state.get("transcript", "")
-        content_safety_details = state.get("content_safety_details", {})
+        content_safety_details = state.get("content_safety_details") or {}
         input_type = state.get("input_type", "unknown")
-        
-        # Generate call ID for flagged content
-        call_id = f"FLAGGED_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        
+
+        # Generate call ID for flagged content (uniquified - see
+        # _generate_call_id)
+        call_id = f"FLAGGED_{now.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+
+        now_iso = now.isoformat()
+
         # Create flagged content record
         flagged_record = {
             "call_id": call_id,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_iso,
             "status": "FLAGGED_FOR_REVIEW",
             "needs_manual_review": True,
             "content_safety_passed": False,
@@ -191,20 +391,18 @@ class DataStorageAgent:
                 "agent_name": None,
                 "caller_name": None,
                 "call_duration": None,
-                "date_time": datetime.now().isoformat()
+                "date_time": now_iso
             }
         }
         
-        # Save to individual file
+        # Save to individual file - compact JSON; these blobs are read by
+        # machines, so skip the indent CPU and byte overhead
         flagged_file = self.storage_dir / "calls" / f"{call_id}.json"
-        with open(flagged_file, 'w', encoding='utf-8') as f:
-            json.dump(flagged_record, f, indent=2, ensure_ascii=False)
-        
-        # Add to main database
-        with open(self.calls_db, 'r', encoding='utf-8') as f:
-            db = json.load(f)
+        with open(flagged_file, 'wb') as f:
+            f.write(orjson.dumps(flagged_record))
         
-        db["calls"].append({
+        # Append to the index (no full-database rewrite)
+        self._append_index_entry({
             "call_id": call_id,
             "timestamp": flagged_record["timestamp"],
             "agent_name": None,
@@ -213,15 +411,11 @@ class DataStorageAgent:
             "status": "FLAGGED_FOR_REVIEW",
             "flagged_categories": content_safety_details.get("flagged_categories", [])
         })
-        
-        with open(self.calls_db, 'w', encoding='utf-8') as f:
-            json.dump(db, f, indent=2, ensure_ascii=False)
-        
+
         # Update state
         flagged_categories = ', '.join(content_safety_details.get("flagged_categories", []))
         
         return {
-            **state,
             "storage_path": str(self.storage_dir),
             "processing_steps": [
                 f"🚨 Data Storage: Flagged content stored as {call_id}",
@@ -233,236 +427,316 @@ class DataStorageAgent:
     def _store_call_record(
         self, 
         call_data: CallData, 
-        summary: Optional[CallSummary], 
-        quality_score: Optional[QualityScore],
-        needs_manual_review: bool = False
+        summary_dict: Optional[Dict[str, Any]], 
+        score_dict: Optional[Dict[str, Any]],
+        needs_manual_review: bool,
+        now: datetime
     ):
         """
         Store complete call record as JSON.
-        
+
         Args:
             call_data: Call data with metadata and conversation
-            summary: Call summary
-            quality_score: Quality evaluation (can be None if scoring failed)
+            summary_dict: Dumped call summary
+            score_dict: Dumped quality evaluation (None if scoring failed)
             needs_manual_review: Flag indicating call needs manual review
+            now: Timestamp shared by all records for this call
         """
-        # Create record
+        metadata = call_data.metadata
+
+        # Create record (the summary/score dicts are already plain)
         record = {
-            "call_id": call_data.metadata.call_id,
-            "timestamp": datetime.now().isoformat(),
+            "call_id": metadata.call_id,
+            "timestamp": now.isoformat(),
             "needs_manual_review": needs_manual_review,
             "metadata": {
-                "agent_name": call_data.metadata.agent_name,
-                "caller_name": call_data.metadata.caller_name,
-                "call_duration": call_data.metadata.call_duration,
-                "date_time": call_data.metadata.date_time
+                "agent_name": metadata.agent_name,
+                "caller_name": metadata.caller_name,
+                "call_duration": metadata.call_duration,
+                "date_time": metadata.date_time
             },
             "conversation": call_data.conversation,
             "conversation_turns": [
                 {"speaker": turn.speaker, "text": turn.text}
                 for turn in call_data.conversation_turns
             ] if call_data.conversation_turns else [],
-            "summary": {
-                "brief_summary": summary.brief_summary,
-                "key_points": summary.key_points,
-                "customer_issue": summary.customer_issue,
-                "resolution": summary.resolution,
-                "action_items": summary.action_items
-            } if summary else None,
-            "quality_score": {
-                "overall_score": quality_score.overall_score,
-                "tone_score": quality_score.tone_score,
-                "professionalism_score": quality_score.professionalism_score,
-                "resolution_score": quality_score.resolution_score,
-                "response_time_score": quality_score.response_time_score,
-                "feedback": quality_score.feedback,
-                "strengths": quality_score.strengths,
-                "areas_for_improvement": quality_score.areas_for_improvement
-            } if quality_score else None
+            "summary": summary_dict,
+            "quality_score": score_dict
         }
         
-        # Save to individual file
-        call_file = self.storage_dir / "calls" / f"{call_data.metadata.call_id}.json"
-        with open(call_file, 'w', encoding='utf-8') as f:
-            json.dump(record, f, indent=2, ensure_ascii=False)
+        # Save to individual file - compact JSON (reports stay indented)
+        call_file = self.storage_dir / "calls" / f"{metadata.call_id}.json"
+        with open(call_file, 'wb') as f:
+            f.write(orjson.dumps(record))
         
-        # Add to main database
-        with open(self.calls_db, 'r', encoding='utf-8') as f:
-            db = json.load(f)
-        
-        db["calls"].append({
-            "call_id": call_data.metadata.call_id,
+        # Append to the index (no full-database rewrite)
+        self._append_index_entry({
+            "call_id": metadata.call_id,
             "timestamp": record["timestamp"],
-            "agent_name": call_data.metadata.agent_name,
-            "overall_score": quality_score.overall_score if quality_score else None,
+            "agent_name": metadata.agent_name,
+            "overall_score": score_dict["overall_score"] if score_dict else None,
             "needs_manual_review": needs_manual_review
         })
-        
-        with open(self.calls_db, 'w', encoding='utf-8') as f:
-            json.dump(db, f, indent=2, ensure_ascii=False)
     
-    def _store_quality_score(self, call_data: CallData, quality_score: QualityScore):
+    def _store_quality_score(self, call_data: CallData, score_dict: Dict[str, Any], now: datetime):
         """
         Store quality score to CSV for easy analysis.
-        
+
         Args:
             call_data: Call data with metadata
-            quality_score: Quality evaluation
-        """
-        row = {
-            'timestamp': datetime.now().isoformat(),
-            'call_id': call_data.metadata.call_id,
-            'agent_name': call_data.metadata.agent_name or 'Unknown',
-            'caller_name': call_data.metadata.caller_name or 'Unknown',
-            'call_duration': call_data.metadata.call_duration or 'N/A',
-            'overall_score': round(quality_score.overall_score, 2),
-            'tone_score': round(quality_score.tone_score, 2),
-            'professionalism_score': round(quality_score.professionalism_score, 2),
-            'resolution_score': round(quality_score.resolution_score, 2),
-            'response_score': round(quality_score.response_time_score, 2),
-            'feedback': quality_score.feedback[:200] if quality_score.feedback else '',  # Truncate
-            'strengths': ' | '.join(quality_score.strengths) if quality_score.strengths else '',
-            'areas_for_improvement': ' | '.join(quality_score.areas_for_improvement) 
-                if quality_score.areas_for_improvement else ''
-        }
-        
-        # Append to CSV
-        with open(self.scores_csv, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=row.keys())
-            writer.writerow(row)
+            score_dict: Dumped quality evaluation
+            now: Timestamp shared by all records for this call
+        """
+        # Values in SCORE_FIELDS order
+        row = (
+            now.isoformat(),
+            call_data.metadata.call_id,
+            call_data.metadata.agent_name or 'Unknown',
+            call_data.metadata.caller_name or 'Unknown',
+            call_data.metadata.call_duration or 'N/A',
+            round(score_dict["overall_score"], 2),
+            round(score_dict["tone_score"], 2),
+            round(score_dict["professionalism_score"], 2),
+            round(score_dict["resolution_score"], 2),
+            round(score_dict["response_time_score"], 2),
+            score_dict["feedback"][:200] if score_dict["feedback"] else '',  # Truncate
+            ' | '.join(score_dict["strengths"]) if score_dict["strengths"] else '',
+            ' | '.join(score_dict["areas_for_improvement"])
+                if score_dict["areas_for_improvement"] else ''
+        )
+
+        # Append via the persistent buffered writer (no open/close per row)
+        self._scores_writer.writerow(row)
     
-    def _update_agent_performance(self, call_data: CallData, quality_score: QualityScore):
+    def _load_agent_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Load per-agent performance stats into memory.
+
+        Reads the JSON stats file if present, otherwise bootstraps once from
+        the legacy CSV so existing deployments keep their history.
+
+        Returns:
+            Mapping of agent name to performance counters
+        """
+        if self.agent_performance_json.exists():
+            try:
+                with open(self.agent_performance_json, 'rb') as f:
+                    stats = orjson.loads(f.read())
+                # Upgrade records persisted in the older average-based schema
+                for entry in stats.values():
+                    if 'sum_overall' not in entry:
+                        n = entry['total_calls']
+                        entry['sum_overall'] = entry.pop('average_overall_score') * n
+                        entry['sum_tone'] = entry.pop('average_tone_score') * n
+                        entry['sum_professionalism'] = entry.pop('average_professionalism_score') * n
+                        entry['sum_resolution'] = entry.pop('average_resolution_score') * n
+                        entry['sum_response'] = entry.pop('average_response_score') * n
+                return stats
+            except Exception as e:
+                print(f"Warning: Could not load agent performance stats: {e}")
+
+        # Bootstrap from the legacy CSV
+        if self.agent_performance_csv.exists() and os.path.getsize(self.agent_performance_csv) > 0:
+            try:
+                df = pd.read_csv(self.agent_performance_csv)
+                return {
+                    row['agent_name']: {
+                        'total_calls': int(row['total_calls']),
+                        'sum_overall': float(row['average_overall_score']) * int(row['total_calls']),
+                        'sum_tone': float(row['average_tone_score']) * int(row['total_calls']),
+                        'sum_professionalism': float(row['average_professionalism_score']) * int(row['total_calls']),
+                        'sum_resolution': float(row['average_resolution_score']) * int(row['total_calls']),
+                        'sum_response': float(row['average_response_score']) * int(row['total_calls']),
+                        'last_updated': row['last_updated']
+                    }
+                    for _, row in df.iterrows()
+                }
+            except Exception:
+                pass
+
+        return {}
+
+    def _flush_agent_stats(self):
+        """Persist the in-memory agent stats to JSON (small, atomic write)."""
+        # Write-then-replace keeps the stats file intact on crash; appends
+        # elsewhere (calls index, scores CSV) are atomic already
+        tmp = self.agent_performance_json.with_suffix('.json.tmp')
+        tmp.write_bytes(orjson.dumps(self._agent_stats))
+        os.replace(tmp, self.agent_performance_json)
+        self._agent_stats_mtime = os.path.getmtime(self.agent_performance_json)
+
+    def _refresh_agent_stats(self):
+        """Reload the stats JSON if another process has updated it."""
+        try:
+            mtime = os.path.getmtime(self.agent_performance_json)
+        except OSError:
+            return
+        if mtime > self._agent_stats_mtime:
+            # Refresh in place: every instance bound to this prototype
+            # holds a reference to this exact dict, so rebinding the
+            # attribute would split one instance off from the others and
+            # later flushes would clobber each other's updates. (The
+            # mtime marker is per instance; the worst a stale one costs
+            # is a redundant reload.)
+            fresh = self._load_agent_stats()
+            self._agent_stats.clear()
+            self._agent_stats.update(fresh)
+            self._agent_stats_mtime = mtime
+
+    def _update_agent_performance(self, call_data: CallData, score_dict: Dict[str, Any], now: datetime):
         """
         Update agent performance metrics.
-        
+
         Args:
             call_data: Call data with metadata
-            quality_score: Quality evaluation
+            score_dict: Dumped quality evaluation
+            now: Timestamp shared by all records for this call
         """
         agent_name = call_data.metadata.agent_name or 'Unknown'
-        
-        # Read existing performance data
-        if self.agent_performance_csv.exists() and os.path.getsize(self.agent_performance_csv) > 0:
-            try:
-                df = pd.read_csv(self.agent_performance_csv)
-            except:
-                # Create empty DataFrame with correct schema
-                df = pd.DataFrame(columns=[
-                    'agent_name', 'total_calls', 'average_overall_score',
-                    'average_tone_score', 'average_professionalism_score',
-                    'average_resolution_score', 'average_response_score',
-                    'last_updated'
-                ])
-        else:
-            # Create empty DataFrame with correct schema
-            df = pd.DataFrame(columns=[
-                'agent_name', 'total_calls', 'average_overall_score',
-                'average_tone_score', 'average_professionalism_score',
-                'average_resolution_score', 'average_response_score',
-                'last_updated'
-            ])
-        
-        # Calculate new metrics
-        if agent_name in df['agent_name'].values if not df.empty else False:
-            # Update existing agent
-            mask = df['agent_name'] == agent_name
-            current_calls = df.loc[mask, 'total_calls'].values[0]
-            new_calls = current_calls + 1
-            
-            # Calculate running averages
-            df.loc[mask, 'average_overall_score'] = (
-                (df.loc[mask, 'average_overall_score'] * current_calls + quality_score.overall_score) 
-                / new_calls
-            )
-            df.loc[mask, 'average_tone_score'] = (
-                (df.loc[mask, 'average_tone_score'] * current_calls + quality_score.tone_score) 
-                / new_calls
-            )
-            df.loc[mask, 'average_professionalism_score'] = (
-                (df.loc[mask, 'average_professionalism_score'] * current_calls + 
-                 quality_score.professionalism_score) / new_calls
-            )
-            df.loc[mask, 'average_resolution_score'] = (
-                (df.loc[mask, 'average_resolution_score'] * current_calls + 
-                 quality_score.resolution_score) / new_calls
-            )
-            df.loc[mask, 'average_response_score'] = (
-                (df.loc[mask, 'average_response_score'] * current_calls + 
-                 quality_score.response_time_score) / new_calls
-            )
-            df.loc[mask, 'total_calls'] = new_calls
-            df.loc[mask, 'last_updated'] = datetime.now().isoformat()
-        else:
-            # Add new agent - using loc to avoid FutureWarning
-            new_data = {
-                'agent_name': agent_name,
-                'total_calls': 1,
-                'average_overall_score': quality_score.overall_score,
-                'average_tone_score': quality_score.tone_score,
-                'average_professionalism_score': quality_score.professionalism_score,
-                'average_resolution_score': quality_score.resolution_score,
-                'average_response_score': quality_score.response_time_score,
-                'last_updated': datetime.now().isoformat()
-            }
-            # Use loc to add new row (more efficient than concat)
-            df.loc[len(df)] = new_data
-        
-        # Save updated performance data
-        df.to_csv(self.agent_performance_csv, index=False)
-    
+
+        # Running sums: updates are pure additions (no read-back of prior
+        # averages, no drift after many updates); averages are computed on
+        # read in get_agent_performance
+        stats = self._agent_stats.setdefault(agent_name, {
+            'total_calls': 0,
+            'sum_overall': 0.0,
+            'sum_tone': 0.0,
+            'sum_professionalism': 0.0,
+            'sum_resolution': 0.0,
+            'sum_response': 0.0,
+            'last_updated': None
+        })
+        stats['total_calls'] += 1
+        stats['sum_overall'] += score_dict["overall_score"]
+        stats['sum_tone'] += score_dict["tone_score"]
+        stats['sum_professionalism'] += score_dict["professionalism_score"]
+        stats['sum_resolution'] += score_dict["resolution_score"]
+        stats['sum_response'] += score_dict["response_time_score"]
+        stats['last_updated'] = now.isoformat()
+
+        self._flush_agent_stats()
+
     def get_agent_performance(self, agent_name: Optional[str] = None) -> pd.DataFrame:
         """
         Retrieve agent performance metrics.
-        
+
         Args:
             agent_name: Specific agent name, or None for all agents
-            
+
         Returns:
             DataFrame with agent performance data
         """
-        if not self.agent_performance_csv.exists():
+        # Pick up stats flushed by other processes since the last read
+        self._refresh_agent_stats()
+
+        if not self._agent_stats:
             return pd.DataFrame()
-        
-        df = pd.read_csv(self.agent_performance_csv)
-        
+
+        # Averages are a computed view over the running sums
+        df = pd.DataFrame([
+            {
+                'agent_name': name,
+                'total_calls': stats['total_calls'],
+                'average_overall_score': stats['sum_overall'] / stats['total_calls'],
+                'average_tone_score': stats['sum_tone'] / stats['total_calls'],
+                'average_professionalism_score': stats['sum_professionalism'] / stats['total_calls'],
+                'average_resolution_score': stats['sum_resolution'] / stats['total_calls'],
+                'average_response_score': stats['sum_response'] / stats['total_calls'],
+                'last_updated': stats['last_updated']
+            }
+            for name, stats in self._agent_stats.items()
+        ])
+
+        # Materialize the CSV on demand for external consumers (atomically,
+        # so a concurrent reader never sees a half-written file)
+        tmp = self.agent_performance_csv.with_suffix('.csv.tmp')
+        df.to_csv(tmp, index=False)
+        os.replace(tmp, self.agent_performance_csv)
+
         if agent_name:
             df = df[df['agent_name'] == agent_name]
-        
+
         return df.sort_values('average_overall_score', ascending=False)
     
+    def _read_scores_csv(self, usecols: List[str]) -> pd.DataFrame:
+        """
+        Read the scores CSV with column projection.
+
+        Uses pyarrow's multithreaded CSV reader when available, falling back
+        to pd.read_csv otherwise.
+
+        Args:
+            usecols: Columns to read
+
+        Returns:
+            DataFrame with the requested columns
+        """
+        if pacsv is not None:
+            table = pacsv.read_csv(
+                self.scores_csv,
+                # The free-text fields (feedback, strengths, ...) routinely
+                # contain quoted embedded newlines, which the default parse
+                # options reject even when those columns are projected away
+                parse_options=pacsv.ParseOptions(newlines_in_values=True),
+                convert_options=pacsv.ConvertOptions(
+                    include_columns=usecols,
+                    # Keep timestamps as ISO strings: pyarrow would infer
+                    # timestamp64 and break the lexicographic-filtering
+                    # contract the pandas fallback upholds
+                    column_types={"timestamp": pa.string()}
+                )
+            )
+            return table.to_pandas(self_destruct=True, split_blocks=True)
+
+        dtypes = {col: self.SCORE_DTYPES[col] for col in usecols if col in self.SCORE_DTYPES}
+        return pd.read_csv(self.scores_csv, usecols=usecols, dtype=dtypes)
+
     def get_quality_scores(
-        self, 
+        self,
         agent_name: Optional[str] = None,
         start_date: Optional[str] = None,
-        end_date: Optional[str] = None
+        end_date: Optional[str] = None,
+        parse_dates: bool = False,
+        columns: Optional[List[str]] = None
     ) -> pd.DataFrame:
         """
         Retrieve quality scores with optional filtering.
-        
+
         Args:
             agent_name: Filter by agent name
             start_date: Start date (ISO format)
             end_date: End date (ISO format)
-            
+            parse_dates: Convert the timestamp column to datetime dtype
+            columns: Columns to read; defaults to the score analytics
+                projection (pass SCORE_FIELDS for the full rows)
+
         Returns:
             DataFrame with quality scores
         """
         if not self.scores_csv.exists():
             return pd.DataFrame()
-        
-        df = pd.read_csv(self.scores_csv)
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        
-        # Apply filters
+
+        # Make buffered score rows visible to the read below
+        if not self._scores_fp.closed:
+            self._scores_fp.flush()
+
+        usecols = columns if columns is not None else self.SCORE_ANALYTICS_COLUMNS
+        df = self._read_scores_csv(usecols)
+
+        # Timestamps are ISO-8601, so filters and sorting compare
+        # lexicographically on the raw strings - no per-row parsing
         if agent_name:
             df = df[df['agent_name'] == agent_name]
-        
+
         if start_date:
-            df = df[df['timestamp'] >= pd.to_datetime(start_date)]
-        
+            df = df[df['timestamp'] >= datetime.fromisoformat(start_date).isoformat()]
+
         if end_date:
-            df = df[df['timestamp'] <= pd.to_datetime(end_date)]
-        
+            df = df[df['timestamp'] <= datetime.fromisoformat(end_date).isoformat()]
+
+        if parse_dates:
+            df['timestamp'] = pd.to_datetime(df['timestamp'])
+
         return df.sort_values('timestamp', ascending=False)
     
     def generate_agent_report(self, agent_name: str) -> Dict[str, Any]:
@@ -475,72 +749,90 @@ class DataStorageAgent:
         Returns:
             Dictionary with performance metrics and insights
         """
-        # Get all scores for this agent
-        scores_df = self.get_quality_scores(agent_name=agent_name)
-        
-        if scores_df.empty:
+        # Read the raw rows for this agent - no DataFrame machinery needed
+        # for a handful of per-column statistics
+        if not self.scores_csv.exists():
             return {"error": f"No data found for agent: {agent_name}"}
-        
-        # Calculate statistics
+
+        if not self._scores_fp.closed:
+            self._scores_fp.flush()
+
+        rows = []
+        with open(self.scores_csv, 'r', newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                if row['agent_name'] == agent_name:
+                    rows.append(row)
+
+        if not rows:
+            return {"error": f"No data found for agent: {agent_name}"}
+
+        # Rows are appended chronologically; scores as an (n, 5) float array
+        scores = np.asarray([
+            (row['overall_score'], row['tone_score'], row['professionalism_score'],
+             row['resolution_score'], row['response_score'])
+            for row in rows
+        ], dtype=np.float64)
+        overall = scores[:, 0]
+
         report = {
             "agent_name": agent_name,
-            "total_calls": len(scores_df),
+            "total_calls": len(rows),
             "date_range": {
-                "start": scores_df['timestamp'].min().isoformat(),
-                "end": scores_df['timestamp'].max().isoformat()
+                "start": rows[0]['timestamp'],
+                "end": rows[-1]['timestamp']
             },
             "scores": {
                 "overall": {
-                    "average": round(scores_df['overall_score'].mean(), 2),
-                    "median": round(scores_df['overall_score'].median(), 2),
-                    "min": round(scores_df['overall_score'].min(), 2),
-                    "max": round(scores_df['overall_score'].max(), 2),
-                    "std_dev": round(scores_df['overall_score'].std(), 2)
+                    "average": round(float(overall.mean()), 2),
+                    "median": round(float(np.median(overall)), 2),
+                    "min": round(float(overall.min()), 2),
+                    "max": round(float(overall.max()), 2),
+                    "std_dev": round(float(overall.std(ddof=1)), 2) if len(rows) > 1 else 0.0
                 },
                 "tone": {
-                    "average": round(scores_df['tone_score'].mean(), 2),
-                    "trend": self._calculate_trend(scores_df['tone_score'])
+                    "average": round(float(scores[:, 1].mean()), 2),
+                    "trend": self._calculate_trend(scores[:, 1])
                 },
                 "professionalism": {
-                    "average": round(scores_df['professionalism_score'].mean(), 2),
-                    "trend": self._calculate_trend(scores_df['professionalism_score'])
+                    "average": round(float(scores[:, 2].mean()), 2),
+                    "trend": self._calculate_trend(scores[:, 2])
                 },
                 "resolution": {
-                    "average": round(scores_df['resolution_score'].mean(), 2),
-                    "trend": self._calculate_trend(scores_df['resolution_score'])
+                    "average": round(float(scores[:, 3].mean()), 2),
+                    "trend": self._calculate_trend(scores[:, 3])
                 },
                 "response": {
-                    "average": round(scores_df['response_score'].mean(), 2),
-                    "trend": self._calculate_trend(scores_df['response_score'])
+                    "average": round(float(scores[:, 4].mean()), 2),
+                    "trend": self._calculate_trend(scores[:, 4])
                 }
             },
-            "performance_rating": self._get_performance_rating(
-                scores_df['overall_score'].mean()
-            ),
-            "recent_calls": scores_df.head(5)[
-                ['timestamp', 'call_id', 'overall_score']
-            ].to_dict('records')
+            "performance_rating": self._get_performance_rating(float(overall.mean())),
+            "recent_calls": [
+                {
+                    "timestamp": row['timestamp'],
+                    "call_id": row['call_id'],
+                    "overall_score": float(row['overall_score'])
+                }
+                for row in rows[-5:][::-1]
+            ]
         }
         
         # Save report
         report_file = self.storage_dir / "reports" / f"{agent_name}_report.json"
-        with open(report_file, 'w', encoding='utf-8') as f:
-            json.dump(report, f, indent=2, default=str)
+        with open(report_file, 'wb') as f:
+            f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY, default=str))
         
         return report
     
-    def _calculate_trend(self, scores: pd.Series) -> str:
-        """Calculate trend (improving, declining, stable)."""
+    def _calculate_trend(self, scores: np.ndarray) -> str:
+        """Calculate trend (improving, declining, stable) on chronological scores."""
         if len(scores) < 2:
             return "insufficient_data"
-        
-        # Compare first half vs second half
+
+        # Compare older half vs recent half
         mid = len(scores) // 2
-        first_half = scores.iloc[:mid].mean()
-        second_half = scores.iloc[mid:].mean()
-        
-        diff = second_half - first_half
-        
+        diff = float(np.mean(scores[mid:]) - np.mean(scores[:mid]))
+
         if diff > 0.5:
             return "improving"
         elif diff < -0.5:
@@ -548,20 +840,16 @@ class DataStorageAgent:
         else:
             return "stable"
     
+    # Rating bands for _get_performance_rating, indexed via bisect
+    _RATING_THRESHOLDS = [5.0, 6.0, 7.0, 8.0, 9.0]
+    _RATING_LABELS = [
+        'Unsatisfactory', 'Needs Improvement', 'Satisfactory',
+        'Good', 'Excellent', 'Outstanding'
+    ]
+
     def _get_performance_rating(self, avg_score: float) -> str:
         """Get performance rating based on average score."""
-        if avg_score >= 9.0:
-            return "Outstanding"
-        elif avg_score >= 8.0:
-            return "Excellent"
-        elif avg_score >= 7.0:
-            return "Good"
-        elif avg_score >= 6.0:
-            return "Satisfactory"
-        elif avg_score >= 5.0:
-            return "Needs Improvement"
-        else:
-            return "Unsatisfactory"
+        return self._RATING_LABELS[bisect.bisect_right(self._RATING_THRESHOLDS, avg_score)]
     
     def get_manual_review_calls(self) -> List[Dict[str, Any]]:
         """
@@ -570,30 +858,18 @@ class DataStorageAgent:
         Returns:
             List of call records flagged for manual review
         """
-        if not self.calls_db.exists():
-            return []
-        
-        with open(self.calls_db, 'r', encoding='utf-8') as f:
-            db = json.load(f)
-        
-        # Filter calls that need manual review
-        manual_review_calls = [
-            call for call in db.get("calls", [])
-            if call.get("needs_manual_review", False)
-        ]
-        
+        # Index seek on needs_manual_review, already sorted by timestamp
+        rows = self.conn.execute(
+            "SELECT call_id FROM calls WHERE needs_manual_review=1 ORDER BY timestamp DESC"
+        ).fetchall()
+
         # Load full details for each call
         detailed_calls = []
-        for call_summary in manual_review_calls:
-            call_id = call_summary.get("call_id")
+        for (call_id,) in rows:
             call_file = self.storage_dir / "calls" / f"{call_id}.json"
-            
+
             if call_file.exists():
-                with open(call_file, 'r', encoding='utf-8') as f:
-                    full_call = json.load(f)
-                    detailed_calls.append(full_call)
-        
-        # Sort by timestamp (most recent first)
-        detailed_calls.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
-        
+                with open(call_file, 'rb') as f:
+                    detailed_calls.append(orjson.loads(f.read()))
+
         return detailed_calls
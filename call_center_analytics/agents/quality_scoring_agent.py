@@ -1,12 +1,111 @@
 """
 Quality Scoring Agent - Evaluates tone, professionalism, and resolution.
 """
-from typing import Dict, Any
-from langchain_openai import ChatOpenAI
+from typing import Any, Dict, List, Optional
 from langchain.prompts import ChatPromptTemplate
-from langchain.output_parsers import PydanticOutputParser
+from utils.parsers import OrjsonPydanticParser
+from utils.batch import build_chat_request, run_chat_batch
 from utils.config import Config
 from utils.models import QualityScore, CallData, CallSummary
+from utils.llm import shared_chat_llm, shared_openai_client
+from agents.analysis_agent import truncate_conversation
+
+
+# Conversations shorter than this use the compact rubric: short calls do
+# not need the full per-band scoring guidance, and the structured output
+# schema already constrains scores to the 0-10 range.
+_SHORT_CONVERSATION_CHARS = 1500
+
+RUBRIC_SHORT_TEMPLATE = """You are an expert call center quality assurance analyst. Evaluate the following short call.
+
+Call Metadata:
+- Agent: {agent_name}
+- Caller: {caller_name}
+- Duration: {duration}
+
+Conversation:
+{conversation}
+
+{summary_section}
+
+Score each criterion 0-10:
+1. TONE AND EMPATHY - warmth and understanding shown to the caller
+2. PROFESSIONALISM - communication skills and courteous language
+3. PROBLEM RESOLUTION / CALL EFFECTIVENESS - how well the issue or inquiry was handled; for calls without a problem, score how effectively the agent addressed the customer's needs
+4. RESPONSE APPROPRIATENESS - relevance and clarity of responses
+
+Provide individual scores, an overall score (average, 0-10), detailed feedback, strengths, and areas for improvement.
+
+{format_instructions}
+"""
+
+RUBRIC_TEMPLATE = """You are an expert call center quality assurance analyst. Evaluate the following call based on a structured rubric.
+
+Call Metadata:
+- Agent: {agent_name}
+- Caller: {caller_name}
+- Duration: {duration}
+
+Conversation:
+{conversation}
+
+{summary_section}
+
+SCORING RUBRIC (0-10 scale for each criterion):
+
+1. TONE AND EMPATHY (0-10):
+   - 9-10: Consistently warm, empathetic, and understanding throughout
+   - 7-8: Generally positive tone with good empathy
+   - 5-6: Neutral tone, adequate empathy
+   - 3-4: Occasionally cold or dismissive
+   - 0-2: Consistently poor tone, lacking empathy
+
+2. PROFESSIONALISM (0-10):
+   - 9-10: Excellent communication skills, proper grammar, courteous language
+   - 7-8: Professional with minor lapses
+   - 5-6: Adequate professionalism
+   - 3-4: Several unprofessional moments
+   - 0-2: Unprofessional behavior or language
+
+3. PROBLEM RESOLUTION / CALL EFFECTIVENESS (0-10):
+   CONTEXT-AWARE SCORING:
+
+   For calls WITH a problem/issue:
+   - 9-10: Issue fully resolved, customer clearly satisfied
+   - 7-8: Issue resolved with minor follow-up needed
+   - 5-6: Partial resolution or unclear outcome
+   - 3-4: Issue not adequately addressed
+   - 0-2: No resolution or made situation worse
+
+   For calls WITHOUT a problem (informational, inquiry, status check):
+   - 9-10: Question fully answered, information clearly provided, customer satisfied
+   - 7-8: Question answered with minor gaps or needed clarification
+   - 5-6: Adequate response but could be more complete
+   - 3-4: Incomplete or unclear information provided
+   - 0-2: Failed to address the inquiry or provided incorrect information
+
+   NOTE: If there was NO issue or problem to resolve, focus on how effectively the agent
+   handled the inquiry, provided information, or addressed the customer's needs.
+
+4. RESPONSE APPROPRIATENESS (0-10):
+   - 9-10: All responses relevant, clear, and helpful
+   - 7-8: Mostly appropriate responses
+   - 5-6: Some responses could be improved
+   - 3-4: Several inappropriate or unclear responses
+   - 0-2: Consistently poor or off-topic responses
+
+Provide:
+1. Individual scores for each criterion (0-10)
+2. Overall score (average of all criteria, 0-10)
+3. Detailed feedback explaining the scores
+4. List of strengths demonstrated
+5. List of areas for improvement
+
+IMPORTANT: Adapt your scoring to the call type. Not all calls have problems to solve -
+some are informational, transactional, or proactive. Score based on effectiveness.
+
+{format_instructions}
+"""
 
 
 class QualityScoringAgent:
@@ -17,13 +116,21 @@ class QualityScoringAgent:
     
     def __init__(self):
         self.name = "Quality Scoring Agent"
-        self.llm = ChatOpenAI(
-            model=Config.GPT_MODEL,
-            temperature=Config.TEMPERATURE,
-            openai_api_key=Config.OPENAI_API_KEY
-        )
-        self.output_parser = PydanticOutputParser(pydantic_object=QualityScore)
-        
+        self.llm = shared_chat_llm()
+        self.output_parser = OrjsonPydanticParser(pydantic_object=QualityScore)
+        # Structured Outputs: the API constrains generation to the QualityScore
+        # schema, so responses parse directly instead of going through the
+        # free-text fallback
+        self.structured_llm = self.llm.with_structured_output(QualityScore)
+        # Deterministic retry used when the first structured call fails;
+        # after that the call goes straight to manual review
+        self._retry_llm = shared_chat_llm(temperature=0).with_structured_output(QualityScore)
+        # Prompt templates and format instructions are invariant - build once.
+        # Short calls get a compact rubric that cuts prefill tokens ~10x.
+        self._prompt = ChatPromptTemplate.from_template(RUBRIC_TEMPLATE)
+        self._prompt_short = ChatPromptTemplate.from_template(RUBRIC_SHORT_TEMPLATE)
+        self._format_instructions = self.output_parser.get_format_instructions()
+
     def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """
         Process call data and generate quality score.
@@ -39,36 +146,30 @@ class QualityScoringAgent:
             summary = state.get("summary")
             
             if not call_data:
-                state["error"] = "No call data available for quality scoring"
-                return state
-            
+                return {"error": "No call data available for quality scoring"}
+
             # Generate quality score
             quality_score = self._evaluate_quality(call_data, summary)
-            
+
             # Check if scoring failed (None returned)
             if quality_score is None:
                 # Scoring failed - mark for manual review
                 return {
-                    **state,
                     "quality_score": None,
                     "needs_manual_review": True,
                     "processing_steps": [
                         " Quality Scoring: Failed - Unable to extract scores from LLM response. Call saved for manual review."
                     ]
                 }
-            
-            # Update state - return new list for operator.add
-            state["quality_score"] = quality_score
-            
+
             return {
-                **state,
+                "quality_score": quality_score,
                 "processing_steps": ["Quality Scoring: Call quality evaluated"]
             }
-            
+
         except Exception as e:
             # Unexpected error - also mark for manual review
             return {
-                **state,
                 "quality_score": None,
                 "needs_manual_review": True,
                 "processing_steps": [
@@ -76,88 +177,172 @@ class QualityScoringAgent:
                 ]
             }
     
+    async def aprocess(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Async variant of process() using ainvoke, so callers can overlap
+        quality scoring across many calls with asyncio.gather.
+
+        Args:
+            state: Current agent state containing call_data and summary
+
+        Returns:
+            Updated state with quality_score
+        """
+        try:
+            call_data = state.get("call_data")
+            summary = state.get("summary")
+
+            if not call_data:
+                return {"error": "No call data available for quality scoring"}
+
+            # Generate quality score
+            quality_score = await self._aevaluate_quality(call_data, summary)
+
+            # Check if scoring failed (None returned)
+            if quality_score is None:
+                # Scoring failed - mark for manual review
+                return {
+                    "quality_score": None,
+                    "needs_manual_review": True,
+                    "processing_steps": [
+                        " Quality Scoring: Failed - Unable to extract scores from LLM response. Call saved for manual review."
+                    ]
+                }
+
+            return {
+                "quality_score": quality_score,
+                "processing_steps": ["Quality Scoring: Call quality evaluated"]
+            }
+
+        except Exception as e:
+            # Unexpected error - also mark for manual review
+            return {
+                "quality_score": None,
+                "needs_manual_review": True,
+                "processing_steps": [
+                    f"⚠️ Quality Scoring: Error - {str(e)}. Call saved for manual review."
+                ]
+            }
+
     def _evaluate_quality(self, call_data: CallData, summary: CallSummary = None) -> QualityScore:
         """
         Evaluate the quality of the call based on multiple criteria.
-        
+
         Args:
             call_data: CallData object containing conversation
             summary: Optional CallSummary object
-            
+
         Returns:
             QualityScore object
         """
-        # Create comprehensive prompt with scoring rubric
-        prompt_template = ChatPromptTemplate.from_template(
-            """You are an expert call center quality assurance analyst. Evaluate the following call based on a structured rubric.
+        messages = self._build_messages(call_data, summary)
 
-Call Metadata:
-- Agent: {agent_name}
-- Caller: {caller_name}
-- Duration: {duration}
+        # Structured output - schema conformance is enforced server-side
+        try:
+            return self.structured_llm.invoke(messages)
+        except Exception:
+            pass
 
-Conversation:
-{conversation}
+        # One deterministic retry; after that, None routes to manual review
+        try:
+            return self._retry_llm.invoke(messages)
+        except Exception:
+            return None
 
-{summary_section}
+    async def _aevaluate_quality(self, call_data: CallData, summary: CallSummary = None) -> QualityScore:
+        """
+        Async counterpart of _evaluate_quality.
 
-SCORING RUBRIC (0-10 scale for each criterion):
+        Args:
+            call_data: CallData object containing conversation
+            summary: Optional CallSummary object
 
-1. TONE AND EMPATHY (0-10):
-   - 9-10: Consistently warm, empathetic, and understanding throughout
-   - 7-8: Generally positive tone with good empathy
-   - 5-6: Neutral tone, adequate empathy
-   - 3-4: Occasionally cold or dismissive
-   - 0-2: Consistently poor tone, lacking empathy
+        Returns:
+            QualityScore object
+        """
+        messages = self._build_messages(call_data, summary)
 
-2. PROFESSIONALISM (0-10):
-   - 9-10: Excellent communication skills, proper grammar, courteous language
-   - 7-8: Professional with minor lapses
-   - 5-6: Adequate professionalism
-   - 3-4: Several unprofessional moments
-   - 0-2: Unprofessional behavior or language
+        # Structured output - schema conformance is enforced server-side
+        try:
+            return await self.structured_llm.ainvoke(messages)
+        except Exception:
+            pass
 
-3. PROBLEM RESOLUTION / CALL EFFECTIVENESS (0-10):
-   CONTEXT-AWARE SCORING:
-   
-   For calls WITH a problem/issue:
-   - 9-10: Issue fully resolved, customer clearly satisfied
-   - 7-8: Issue resolved with minor follow-up needed
-   - 5-6: Partial resolution or unclear outcome
-   - 3-4: Issue not adequately addressed
-   - 0-2: No resolution or made situation worse
-   
-   For calls WITHOUT a problem (informational, inquiry, status check):
-   - 9-10: Question fully answered, information clearly provided, customer satisfied
-   - 7-8: Question answered with minor gaps or needed clarification
-   - 5-6: Adequate response but could be more complete
-   - 3-4: Incomplete or unclear information provided
-   - 0-2: Failed to address the inquiry or provided incorrect information
-   
-   NOTE: If there was NO issue or problem to resolve, focus on how effectively the agent 
-   handled the inquiry, provided information, or addressed the customer's needs.
+        # One deterministic retry; after that, None routes to manual review
+        try:
+            return await self._retry_llm.ainvoke(messages)
+        except Exception:
+            return None
 
-4. RESPONSE APPROPRIATENESS (0-10):
-   - 9-10: All responses relevant, clear, and helpful
-   - 7-8: Mostly appropriate responses
-   - 5-6: Some responses could be improved
-   - 3-4: Several inappropriate or unclear responses
-   - 0-2: Consistently poor or off-topic responses
+    def score_batch(self, calls: List[CallData],
+                    summaries: List[Optional[CallSummary]] = None,
+                    poll_interval: int = 30) -> List[Optional[QualityScore]]:
+        """
+        Score many calls in one OpenAI Batch API submission.
 
-Provide:
-1. Individual scores for each criterion (0-10)
-2. Overall score (average of all criteria, 0-10)
-3. Detailed feedback explaining the scores
-4. List of strengths demonstrated
-5. List of areas for improvement
+        Offline backfill path: packages one chat-completion request per
+        call into a JSONL batch (50% cheaper than synchronous calls),
+        polls until the batch completes, then parses each response into
+        a QualityScore. Falls back to synchronous scoring per call if
+        the batch submission itself fails.
 
-IMPORTANT: Adapt your scoring to the call type. Not all calls have problems to solve - 
-some are informational, transactional, or proactive. Score based on effectiveness.
+        Args:
+            calls: CallData objects to score
+            summaries: Optional matching CallSummary objects
+            poll_interval: Seconds between batch status polls
 
-{format_instructions}
-"""
-        )
-        
+        Returns:
+            One QualityScore (or None on parse failure) per call, in order
+        """
+        if not calls:
+            return []
+        if summaries is None:
+            summaries = [None] * len(calls)
+
+        request_lines = [
+            build_chat_request(
+                f"score-{i}",
+                self._build_prompt_text(call_data, summary),
+                Config.GPT_MODEL,
+                temperature=Config.TEMPERATURE
+            )
+            for i, (call_data, summary) in enumerate(zip(calls, summaries))
+        ]
+
+        try:
+            responses = run_chat_batch(
+                shared_openai_client(), request_lines, poll_interval=poll_interval
+            )
+        except Exception:
+            # Batch submission failed - fall back to synchronous scoring
+            return [
+                self._evaluate_quality(call_data, summary)
+                for call_data, summary in zip(calls, summaries)
+            ]
+
+        scores: List[Optional[QualityScore]] = []
+        for i in range(len(calls)):
+            content = responses.get(f"score-{i}")
+            if content is None:
+                scores.append(None)
+                continue
+            try:
+                scores.append(self.output_parser.parse(content))
+            except Exception:
+                scores.append(None)
+        return scores
+
+    def _prompt_vars(self, call_data: CallData, summary: CallSummary = None) -> Dict[str, str]:
+        """
+        Assemble the template variables for one call's evaluation prompt.
+
+        Args:
+            call_data: CallData object containing conversation
+            summary: Optional CallSummary object
+
+        Returns:
+            Template variable dict shared by the message and text builders
+        """
         # Build summary section if available
         summary_section = ""
         if summary:
@@ -171,131 +356,52 @@ Key Points:
 Customer Issue: {summary.customer_issue or 'N/A'}
 Resolution: {summary.resolution or 'N/A'}
 """
-        
-        # Format the prompt
-        format_instructions = self.output_parser.get_format_instructions()
-        
-        messages = prompt_template.format_messages(
-            agent_name=call_data.metadata.agent_name or "Unknown",
-            caller_name=call_data.metadata.caller_name or "Unknown",
-            duration=call_data.metadata.call_duration or "N/A",
-            conversation=call_data.conversation,
-            summary_section=summary_section,
-            format_instructions=format_instructions
+
+        return {
+            "agent_name": call_data.metadata.agent_name or "Unknown",
+            "caller_name": call_data.metadata.caller_name or "Unknown",
+            "duration": call_data.metadata.call_duration or "N/A",
+            "conversation": truncate_conversation(call_data.conversation),
+            "summary_section": summary_section,
+            "format_instructions": self._format_instructions
+        }
+
+    def _pick_prompt(self, call_data: CallData) -> ChatPromptTemplate:
+        """Short calls do not need the full per-band rubric."""
+        return (
+            self._prompt_short
+            if len(call_data.conversation) < _SHORT_CONVERSATION_CHARS
+            else self._prompt
         )
-        
-        # Get response from LLM
-        response = self.llm.invoke(messages)
-        
-        # Parse the response
-        try:
-            quality_score = self.output_parser.parse(response.content)
-        except Exception as parse_error:
-            # Fallback: create score from raw text
-            quality_score = self._create_fallback_score(response.content)
-            # If fallback also fails (returns None), return None
-            if quality_score is None:
-                return None
-        
-        return quality_score
-    
-    def _create_fallback_score(self, raw_text: str) -> QualityScore:
+
+    def _build_messages(self, call_data: CallData, summary: CallSummary = None):
         """
-        Create a basic quality score when structured parsing fails.
-        Only uses scores that can be extracted from text - no arbitrary defaults.
-        
+        Build the quality evaluation prompt messages for one call.
+
         Args:
-            raw_text: Raw LLM response text
-            
+            call_data: CallData object containing conversation
+            summary: Optional CallSummary object
+
         Returns:
-            QualityScore object with extracted values or None indicators for missing scores
+            List of formatted prompt messages
         """
-        import re
-        
-        # Track which scores were successfully extracted
-        extracted_scores = {}
-        
-        # Look for score patterns
-        tone_match = re.search(r'tone[^:]*:\s*(\d+(?:\.\d+)?)', raw_text, re.IGNORECASE)
-        if tone_match:
-            extracted_scores['tone'] = float(tone_match.group(1))
-        
-        prof_match = re.search(r'professionalism[^:]*:\s*(\d+(?:\.\d+)?)', raw_text, re.IGNORECASE)
-        if prof_match:
-            extracted_scores['professionalism'] = float(prof_match.group(1))
-        
-        res_match = re.search(r'resolution[^:]*:\s*(\d+(?:\.\d+)?)', raw_text, re.IGNORECASE)
-        if res_match:
-            extracted_scores['resolution'] = float(res_match.group(1))
-        
-        resp_match = re.search(r'response[^:]*:\s*(\d+(?:\.\d+)?)', raw_text, re.IGNORECASE)
-        if resp_match:
-            extracted_scores['response_time'] = float(resp_match.group(1))
-        
-        overall_match = re.search(r'overall[^:]*:\s*(\d+(?:\.\d+)?)', raw_text, re.IGNORECASE)
-        if overall_match:
-            extracted_scores['overall'] = float(overall_match.group(1))
-        
-        # Calculate overall as mean of extracted individual scores (if not found directly)
-        if 'overall' not in extracted_scores and extracted_scores:
-            individual_scores = [
-                extracted_scores.get('tone'),
-                extracted_scores.get('professionalism'),
-                extracted_scores.get('resolution'),
-                extracted_scores.get('response_time')
-            ]
-            # Only include scores that were actually found
-            valid_scores = [s for s in individual_scores if s is not None]
-            if valid_scores:
-                extracted_scores['overall'] = sum(valid_scores) / len(valid_scores)
-        
-        # Check if we have enough data to create a reliable score
-        # We need at least the overall score OR at least 2 individual scores
-        has_enough_data = (
-            'overall' in extracted_scores or 
-            len(extracted_scores) >= 2
+        return self._pick_prompt(call_data).format_messages(
+            **self._prompt_vars(call_data, summary)
         )
-        
-        if not has_enough_data:
-            # Not enough data extracted - return None to indicate scoring should be skipped
-            # This will be handled by the workflow
-            return None
-        
-        # Extract strengths and improvements
-        strengths = []
-        improvements = []
-        
-        lines = raw_text.split('\n')
-        current_section = None
-        
-        for line in lines:
-            line = line.strip()
-            if 'strength' in line.lower():
-                current_section = 'strengths'
-                continue
-            elif 'improvement' in line.lower() or 'area' in line.lower():
-                current_section = 'improvements'
-                continue
-            
-            if current_section == 'strengths' and line.startswith(('-', '•', '*')):
-                strengths.append(line.lstrip('-•* '))
-            elif current_section == 'improvements' and line.startswith(('-', '•', '*')):
-                improvements.append(line.lstrip('-•* '))
-        
-        if not strengths:
-            strengths = ["Professional communication"]
-        if not improvements:
-            improvements = ["Manual review needed - automated scoring incomplete"]
-        
-        # Use extracted scores or 0.0 for missing ones (will be marked as unreliable)
-        return QualityScore(
-            overall_score=extracted_scores.get('overall', 0.0),
-            tone_score=extracted_scores.get('tone', 0.0),
-            professionalism_score=extracted_scores.get('professionalism', 0.0),
-            resolution_score=extracted_scores.get('resolution', 0.0),
-            response_time_score=extracted_scores.get('response_time', 0.0),
-            feedback=f"⚠️ Partial extraction ({len(extracted_scores)} scores found). " + 
-                     (raw_text[:400] if len(raw_text) > 400 else raw_text),
-            strengths=strengths,
-            areas_for_improvement=improvements
+
+    def _build_prompt_text(self, call_data: CallData, summary: CallSummary = None) -> str:
+        """
+        Build the evaluation prompt as one text block for the Batch API,
+        which takes raw request bodies rather than message objects.
+
+        Args:
+            call_data: CallData object containing conversation
+            summary: Optional CallSummary object
+
+        Returns:
+            Formatted prompt string
+        """
+        return self._pick_prompt(call_data).format(
+            **self._prompt_vars(call_data, summary)
         )
+
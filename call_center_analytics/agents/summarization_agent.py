@@ -2,11 +2,51 @@
 Summarization Agent - Generates summaries and key points using GPT.
 """
 from typing import Dict, Any
-from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
-from langchain.output_parsers import PydanticOutputParser
+from utils.parsers import OrjsonPydanticParser
 from utils.config import Config
 from utils.models import CallSummary, CallData
+from utils.llm import shared_chat_llm
+from agents.analysis_agent import truncate_conversation
+
+
+SUMMARY_TEMPLATE = """You are an expert call center analyst. Analyze the following call transcript and provide a comprehensive summary.
+
+Call Metadata:
+- Call ID: {call_id}
+- Caller: {caller_name}
+- Agent: {agent_name}
+- Duration: {duration}
+- Date/Time: {date_time}
+
+Conversation:
+{conversation}
+
+Please provide:
+1. A brief summary (2-3 sentences) of the overall call
+2. Key points discussed in the conversation
+3. The main customer issue or request
+4. How the issue was resolved (if applicable)
+5. Any action items or follow-ups needed
+
+{format_instructions}
+"""
+
+
+# Section headers recognized by the fallback parser, checked in order.
+_SECTION_KEYS = [
+    ("brief summary", "summary"),
+    ("summary:", "summary"),
+    ("key points", "key_points"),
+    ("customer issue", "issue"),
+    ("main issue", "issue"),
+    ("resolution", "resolution"),
+    ("resolved", "resolution"),
+    ("action items", "action_items"),
+    ("follow-up", "action_items"),
+]
+
+_BULLETS = "-•*"
 
 
 class SummarizationAgent:
@@ -17,13 +57,12 @@ class SummarizationAgent:
     
     def __init__(self):
         self.name = "Summarization Agent"
-        self.llm = ChatOpenAI(
-            model=Config.GPT_MODEL,
-            temperature=Config.TEMPERATURE,
-            openai_api_key=Config.OPENAI_API_KEY
-        )
-        self.output_parser = PydanticOutputParser(pydantic_object=CallSummary)
-        
+        self.llm = shared_chat_llm()
+        self.output_parser = OrjsonPydanticParser(pydantic_object=CallSummary)
+        # Prompt template and format instructions are invariant - build once
+        self._prompt = ChatPromptTemplate.from_template(SUMMARY_TEMPLATE)
+        self._format_instructions = self.output_parser.get_format_instructions()
+
     def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """
         Process call data and generate summary.
@@ -38,84 +77,111 @@ class SummarizationAgent:
             call_data = state.get("call_data")
             
             if not call_data:
-                state["error"] = "No call data available for summarization"
-                return state
-            
+                return {"error": "No call data available for summarization"}
+
             # Generate summary
             summary = self._generate_summary(call_data)
-            
-            # Update state - return new list for operator.add
-            state["summary"] = summary
-            
+
             return {
-                **state,
+                "summary": summary,
                 "processing_steps": ["Summarization: Call summary generated"]
             }
-            
+
         except Exception as e:
-            state["error"] = f"Summarization Agent error: {str(e)}"
-            return state
-    
+            return {"error": f"Summarization Agent error: {str(e)}"}
+
+    async def aprocess(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Async variant of process() using ainvoke, so callers can overlap
+        summarization across many calls with asyncio.gather.
+
+        Args:
+            state: Current agent state containing call_data
+
+        Returns:
+            Updated state with summary
+        """
+        try:
+            call_data = state.get("call_data")
+
+            if not call_data:
+                return {"error": "No call data available for summarization"}
+
+            # Generate summary
+            summary = await self._agenerate_summary(call_data)
+
+            return {
+                "summary": summary,
+                "processing_steps": ["Summarization: Call summary generated"]
+            }
+
+        except Exception as e:
+            return {"error": f"Summarization Agent error: {str(e)}"}
+
     def _generate_summary(self, call_data: CallData) -> CallSummary:
         """
         Generate a comprehensive summary of the call.
-        
+
         Args:
             call_data: CallData object containing conversation
-            
+
         Returns:
             CallSummary object
         """
-        # Create prompt template
-        prompt_template = ChatPromptTemplate.from_template(
-            """You are an expert call center analyst. Analyze the following call transcript and provide a comprehensive summary.
+        # Get response from LLM
+        response = self.llm.invoke(self._build_messages(call_data))
 
-Call Metadata:
-- Call ID: {call_id}
-- Caller: {caller_name}
-- Agent: {agent_name}
-- Duration: {duration}
-- Date/Time: {date_time}
+        # Parse the response
+        try:
+            summary = self.output_parser.parse(response.content)
+        except Exception as parse_error:
+            # Fallback: create summary from raw text
+            summary = self._create_fallback_summary(response.content, call_data)
 
-Conversation:
-{conversation}
+        return summary
 
-Please provide:
-1. A brief summary (2-3 sentences) of the overall call
-2. Key points discussed in the conversation
-3. The main customer issue or request
-4. How the issue was resolved (if applicable)
-5. Any action items or follow-ups needed
+    async def _agenerate_summary(self, call_data: CallData) -> CallSummary:
+        """
+        Async counterpart of _generate_summary.
+
+        Args:
+            call_data: CallData object containing conversation
+
+        Returns:
+            CallSummary object
+        """
+        # Get response from LLM without blocking the event loop
+        response = await self.llm.ainvoke(self._build_messages(call_data))
 
-{format_instructions}
-"""
-        )
-        
-        # Format the prompt
-        format_instructions = self.output_parser.get_format_instructions()
-        
-        messages = prompt_template.format_messages(
-            call_id=call_data.metadata.call_id or "N/A",
-            caller_name=call_data.metadata.caller_name or "Unknown",
-            agent_name=call_data.metadata.agent_name or "Unknown",
-            duration=call_data.metadata.call_duration or "N/A",
-            date_time=call_data.metadata.date_time or "N/A",
-            conversation=call_data.conversation,
-            format_instructions=format_instructions
-        )
-        
-        # Get response from LLM
-        response = self.llm.invoke(messages)
-        
         # Parse the response
         try:
             summary = self.output_parser.parse(response.content)
         except Exception as parse_error:
             # Fallback: create summary from raw text
             summary = self._create_fallback_summary(response.content, call_data)
-        
+
         return summary
-    
+
+    def _build_messages(self, call_data: CallData):
+        """
+        Build the summarization prompt messages for one call.
+
+        Args:
+            call_data: CallData object containing conversation
+
+        Returns:
+            List of formatted prompt messages
+        """
+        return self._prompt.format_messages(
+            call_id=call_data.metadata.call_id or "N/A",
+            caller_name=call_data.metadata.caller_name or "Unknown",
+            agent_name=call_data.metadata.agent_name or "Unknown",
+            duration=call_data.metadata.call_duration or "N/A",
+            date_time=call_data.metadata.date_time or "N/A",
+            conversation=truncate_conversation(call_data.conversation),
+            format_instructions=self._format_instructions
+        )
+
     def _create_fallback_summary(self, raw_text: str, call_data: CallData) -> CallSummary:
         """
         Create a basic summary when structured parsing fails.
@@ -127,51 +193,39 @@ Please provide:
         Returns:
             CallSummary object
         """
-        # Extract sections from raw text
-        lines = raw_text.split('\n')
-        
+        # Extract sections from raw text in a single pass
         brief_summary = ""
         key_points = []
         customer_issue = None
         resolution = None
         action_items = []
-        
+
         current_section = None
-        
-        for line in lines:
+
+        for line in raw_text.split('\n'):
             line = line.strip()
             if not line:
                 continue
-            
-            # Detect sections
-            if "brief summary" in line.lower() or "summary:" in line.lower():
-                current_section = "summary"
-                continue
-            elif "key points" in line.lower():
-                current_section = "key_points"
-                continue
-            elif "customer issue" in line.lower() or "main issue" in line.lower():
-                current_section = "issue"
-                continue
-            elif "resolution" in line.lower() or "resolved" in line.lower():
-                current_section = "resolution"
-                continue
-            elif "action items" in line.lower() or "follow-up" in line.lower():
-                current_section = "action_items"
-                continue
-            
-            # Add content to appropriate section
-            if current_section == "summary" and not brief_summary:
-                brief_summary = line
-            elif current_section == "key_points" and line.startswith(('-', '•', '*', str)):
-                key_points.append(line.lstrip('-•* 0123456789.'))
-            elif current_section == "issue" and not customer_issue:
-                customer_issue = line
-            elif current_section == "resolution" and not resolution:
-                resolution = line
-            elif current_section == "action_items" and line.startswith(('-', '•', '*', str)):
-                action_items.append(line.lstrip('-•* 0123456789.'))
-        
+
+            # Detect sections (lowercase each line exactly once)
+            low = line.lower()
+            for needle, section in _SECTION_KEYS:
+                if needle in low:
+                    current_section = section
+                    break
+            else:
+                # Add content to appropriate section
+                if current_section == "summary" and not brief_summary:
+                    brief_summary = line
+                elif current_section == "key_points" and line[0] in _BULLETS:
+                    key_points.append(line.lstrip('-•* 0123456789.'))
+                elif current_section == "issue" and not customer_issue:
+                    customer_issue = line
+                elif current_section == "resolution" and not resolution:
+                    resolution = line
+                elif current_section == "action_items" and line[0] in _BULLETS:
+                    action_items.append(line.lstrip('-•* 0123456789.'))
+
         # Fallback values if parsing failed
         if not brief_summary:
             brief_summary = f"Call between {call_data.metadata.caller_name or 'customer'} and {call_data.metadata.agent_name or 'agent'}."
@@ -2,21 +2,167 @@
 Transcription Agent - Converts audio to text using OpenAI Whisper.
 """
 import os
-from typing import Dict, Any
-from openai import OpenAI
+import asyncio
+import glob
+import hashlib
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, Any, List, Optional
 from utils.config import Config
+from utils.llm import shared_openai_client, shared_async_openai_client
+
+
+# Frozen for O(1) membership checks on the hot ingest path
+_SUPPORTED = frozenset(Config.SUPPORTED_AUDIO_FORMATS)
+
+# Optional ffmpeg preprocessing: 16 kHz mono Opus at speech bitrate cuts the
+# upload payload 10-30x versus 44.1 kHz stereo WAV/MP3 with no transcription
+# accuracy loss, and keeps long calls under the 25 MB Whisper limit.
+_FFMPEG = shutil.which("ffmpeg")
+
+# Whisper rejects uploads over 25 MB; files still over the limit after
+# compression are split into ~10-minute segments and transcribed in parallel.
+_MAX_UPLOAD_BYTES = 25 * 1024 * 1024
+_SEGMENT_SECONDS = 600
+
+
+def _file_digest(audio_file_path: str) -> str:
+    """Content hash used to key cached encodes and segment sets."""
+    with open(audio_file_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:32]
+
+
+def _compress_for_upload(audio_file_path: str) -> str:
+    """
+    Re-encode audio to 16 kHz mono Opus for upload, if ffmpeg is available.
+
+    Encoded files are cached in the temp directory keyed on the source
+    bytes, so retries and reprocessing skip the encode. Any failure falls
+    back to uploading the original file.
+
+    Args:
+        audio_file_path: Path to the source audio file
+
+    Returns:
+        Path to the compressed .ogg, or the original path
+    """
+    if _FFMPEG is None:
+        return audio_file_path
+
+    partial = None
+    try:
+        digest = _file_digest(audio_file_path)
+        compressed = os.path.join(tempfile.gettempdir(), f"whisper_{digest}.ogg")
+        if os.path.exists(compressed):
+            return compressed
+
+        # Encode to a working name and publish with an atomic rename: a
+        # timed-out or killed encode must never leave a truncated file at
+        # the cache path, where every later run would trust it
+        partial = os.path.join(tempfile.gettempdir(), f"whisper_{digest}.part.ogg")
+        result = subprocess.run(
+            [_FFMPEG, "-y", "-i", audio_file_path,
+             "-ac", "1", "-ar", "16000", "-c:a", "libopus", "-b:a", "16k",
+             partial],
+            capture_output=True,
+            timeout=300
+        )
+        if result.returncode == 0 and os.path.exists(partial):
+            os.replace(partial, compressed)
+            return compressed
+    except Exception:
+        pass
+    finally:
+        if partial is not None and os.path.exists(partial):
+            try:
+                os.unlink(partial)
+            except OSError:
+                pass
+
+    return audio_file_path
+
+
+def _split_audio(audio_file_path: str) -> List[str]:
+    """
+    Split audio into ~10-minute 16 kHz mono Opus segments via ffmpeg.
+
+    Segment sets are cached in the temp directory keyed on the source
+    bytes, like single-file encodes.
+
+    Args:
+        audio_file_path: Path to the source audio file
+
+    Returns:
+        Ordered segment paths, or an empty list if splitting is unavailable
+    """
+    if _FFMPEG is None:
+        return []
+
+    work_dir = None
+    try:
+        digest = _file_digest(audio_file_path)
+        # Segments live in a per-digest directory whose existence means
+        # "complete set": ffmpeg writes into a .part working directory
+        # that is only renamed into place after a clean exit, so an
+        # interrupted split can never be mistaken for a finished one
+        # (a partial flat file set would silently drop the call's tail)
+        seg_dir = os.path.join(tempfile.gettempdir(), f"whisper_{digest}_segments")
+        if os.path.isdir(seg_dir):
+            return sorted(glob.glob(os.path.join(seg_dir, "[0-9][0-9][0-9].ogg")))
+
+        work_dir = seg_dir + ".part"
+        shutil.rmtree(work_dir, ignore_errors=True)
+        os.makedirs(work_dir)
+
+        result = subprocess.run(
+            [_FFMPEG, "-y", "-i", audio_file_path,
+             "-ac", "1", "-ar", "16000", "-c:a", "libopus", "-b:a", "16k",
+             "-f", "segment", "-segment_time", str(_SEGMENT_SECONDS),
+             os.path.join(work_dir, "%03d.ogg")],
+            capture_output=True,
+            timeout=1800
+        )
+        if result.returncode == 0 and glob.glob(os.path.join(work_dir, "*.ogg")):
+            try:
+                os.rename(work_dir, seg_dir)
+                work_dir = None
+            except OSError:
+                # A concurrent run published first - use its set
+                pass
+            return sorted(glob.glob(os.path.join(seg_dir, "[0-9][0-9][0-9].ogg")))
+    except Exception:
+        pass
+    finally:
+        if work_dir is not None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    return []
 
 
 class TranscriptionAgent:
     """
     Agent responsible for converting audio files to text using Whisper API.
     """
-    
+
     def __init__(self):
         self.name = "Transcription Agent"
-        self.client = OpenAI(api_key=Config.OPENAI_API_KEY)
+        self.client = shared_openai_client()
+        self.async_client = shared_async_openai_client()
         self.model = Config.WHISPER_MODEL
-        
+        # Re-processing the same audio (rubric change, re-summarization)
+        # should not re-upload 25 MB to Whisper. The transcription endpoint
+        # does not accept pre-uploaded file IDs, so cache results keyed on
+        # (path, size, mtime) instead.
+        self._transcript_cache: Dict[tuple, str] = {}
+
+    @staticmethod
+    def _cache_key(audio_file_path: str) -> tuple:
+        """Cache key that invalidates when the file is replaced or edited."""
+        stat = os.stat(audio_file_path)
+        return (audio_file_path, stat.st_size, stat.st_mtime_ns)
+
     def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """
         Process audio file and transcribe it to text.
@@ -31,34 +177,76 @@ class TranscriptionAgent:
             audio_file_path = state.get("input_content", "")
             
             if not audio_file_path:
-                state["error"] = "No audio file path provided"
-                return state
-            
-            if not os.path.exists(audio_file_path):
-                state["error"] = f"Audio file not found: {audio_file_path}"
-                return state
-            
+                return {"error": "No audio file path provided"}
+
+            # Single stat covers both the existence check and (via the cache
+            # key) size/mtime - avoids repeated syscalls per file
+            try:
+                os.stat(audio_file_path)
+            except OSError:
+                return {"error": f"Audio file not found: {audio_file_path}"}
+
             # Check file extension
             file_ext = os.path.splitext(audio_file_path)[1].lower()
-            if file_ext not in Config.SUPPORTED_AUDIO_FORMATS:
-                state["error"] = f"Unsupported audio format: {file_ext}"
-                return state
-            
+            if file_ext not in _SUPPORTED:
+                return {"error": f"Unsupported audio format: {file_ext}"}
+
             # Transcribe audio
             transcription = self._transcribe_audio(audio_file_path)
-            
-            # Update state - return new list for operator.add
-            state["transcript"] = transcription
-            
+
             return {
-                **state,
+                "transcript": transcription,
                 "processing_steps": ["Transcription: Audio converted to text"]
             }
-            
+
         except Exception as e:
-            state["error"] = f"Transcription Agent error: {str(e)}"
-            return state
-    
+            return {"error": f"Transcription Agent error: {str(e)}"}
+
+    async def aprocess(
+        self,
+        state: Dict[str, Any],
+        on_segment: Optional[Callable[[str], Awaitable[Any]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Async variant of process() using the AsyncOpenAI client, so the
+        event loop stays free while Whisper uploads are in flight.
+
+        Args:
+            state: Current agent state containing input_content (file path)
+            on_segment: Optional hook fired with each chunk's text during
+                chunked transcription, letting callers overlap work
+                (e.g. moderation) with the remaining transcription
+
+        Returns:
+            Updated state with transcription
+        """
+        try:
+            audio_file_path = state.get("input_content", "")
+
+            if not audio_file_path:
+                return {"error": "No audio file path provided"}
+
+            try:
+                os.stat(audio_file_path)
+            except OSError:
+                return {"error": f"Audio file not found: {audio_file_path}"}
+
+            file_ext = os.path.splitext(audio_file_path)[1].lower()
+            if file_ext not in _SUPPORTED:
+                return {"error": f"Unsupported audio format: {file_ext}"}
+
+            transcription = await self._atranscribe_audio(
+                audio_file_path, on_segment=on_segment
+            )
+
+            return {
+                "transcript": transcription,
+                "processing_steps": ["Transcription: Audio converted to text"]
+            }
+
+        except Exception as e:
+            return {"error": f"Transcription Agent error: {str(e)}"}
+
     def _transcribe_audio(self, audio_file_path: str) -> str:
         """
         Transcribe audio file using OpenAI Whisper API.
@@ -69,19 +257,178 @@ class TranscriptionAgent:
         Returns:
             Transcribed text
         """
+        key = self._cache_key(audio_file_path)
+        cached = self._transcript_cache.get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            upload_path = _compress_for_upload(audio_file_path)
+
+            if os.path.getsize(upload_path) > _MAX_UPLOAD_BYTES:
+                transcript = self._transcribe_chunked(audio_file_path)
+            else:
+                with open(upload_path, "rb") as audio_file:
+                    transcript = self.client.audio.transcriptions.create(
+                        model=self.model,
+                        file=audio_file,
+                        response_format="text"
+                    )
+
+            self._transcript_cache[key] = transcript
+            return transcript
+
+        except Exception as e:
+            raise Exception(f"Failed to transcribe audio: {str(e)}")
+
+    def _transcribe_segment(self, segment_path: str) -> str:
+        """Transcribe one pre-encoded segment."""
+        with open(segment_path, "rb") as audio_file:
+            return self.client.audio.transcriptions.create(
+                model=self.model,
+                file=audio_file,
+                response_format="text"
+            )
+
+    def _transcribe_chunked(self, audio_file_path: str, max_workers: int = 4) -> str:
+        """
+        Transcribe an over-limit file as parallel segments.
+
+        Splitting on ~10-minute boundaries keeps each upload well under the
+        25 MB cap, and transcribing segments concurrently bounds wall time
+        by the slowest chunk instead of the sum.
+
+        Args:
+            audio_file_path: Path to the source audio file
+            max_workers: Maximum concurrent segment uploads
+
+        Returns:
+            Concatenated transcript in segment order
+        """
+        segments = _split_audio(audio_file_path)
+        if not segments:
+            raise Exception(
+                "Audio exceeds the 25 MB Whisper limit and could not be "
+                "split (ffmpeg required)"
+            )
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            parts = list(executor.map(self._transcribe_segment, segments))
+
+        return " ".join(part.strip() for part in parts)
+
+    async def _atranscribe_chunked(
+        self,
+        audio_file_path: str,
+        max_concurrency: int = 4,
+        on_segment: Optional[Callable[[str], Awaitable[Any]]] = None,
+    ) -> str:
+        """
+        Async counterpart of _transcribe_chunked.
+
+        When on_segment is given, it is fired with each segment's text as
+        soon as that segment finishes, so downstream work (moderation)
+        overlaps the remaining transcription instead of waiting for the
+        full transcript.
+        """
+        segments = _split_audio(audio_file_path)
+        if not segments:
+            raise Exception(
+                "Audio exceeds the 25 MB Whisper limit and could not be "
+                "split (ffmpeg required)"
+            )
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+        side_tasks = []
+
+        async def transcribe_one(segment_path: str) -> str:
+            async with semaphore:
+                with open(segment_path, "rb") as audio_file:
+                    text = await self.async_client.audio.transcriptions.create(
+                        model=self.model,
+                        file=audio_file,
+                        response_format="text"
+                    )
+            if on_segment is not None:
+                side_tasks.append(asyncio.ensure_future(on_segment(text)))
+            return text
+
+        parts = await asyncio.gather(*(transcribe_one(seg) for seg in segments))
+        if side_tasks:
+            await asyncio.gather(*side_tasks, return_exceptions=True)
+        return " ".join(part.strip() for part in parts)
+
+    async def _atranscribe_audio(
+        self,
+        audio_file_path: str,
+        on_segment: Optional[Callable[[str], Awaitable[Any]]] = None,
+    ) -> str:
+        """
+        Async counterpart of _transcribe_audio.
+
+        Args:
+            audio_file_path: Path to the audio file
+            on_segment: Optional hook fired with each chunk's text during
+                chunked transcription (ignored for single-shot uploads)
+
+        Returns:
+            Transcribed text
+        """
+        key = self._cache_key(audio_file_path)
+        cached = self._transcript_cache.get(key)
+        if cached is not None:
+            return cached
+
         try:
-            with open(audio_file_path, "rb") as audio_file:
-                transcript = self.client.audio.transcriptions.create(
-                    model=self.model,
-                    file=audio_file,
-                    response_format="text"
+            upload_path = _compress_for_upload(audio_file_path)
+
+            if os.path.getsize(upload_path) > _MAX_UPLOAD_BYTES:
+                transcript = await self._atranscribe_chunked(
+                    audio_file_path, on_segment=on_segment
                 )
-            
+            else:
+                with open(upload_path, "rb") as audio_file:
+                    transcript = await self.async_client.audio.transcriptions.create(
+                        model=self.model,
+                        file=audio_file,
+                        response_format="text"
+                    )
+
+            self._transcript_cache[key] = transcript
             return transcript
-            
+
         except Exception as e:
             raise Exception(f"Failed to transcribe audio: {str(e)}")
-    
+
+    async def atranscribe_many(
+        self, audio_file_paths: List[str], max_concurrency: int = 4
+    ) -> List[Any]:
+        """
+        Transcribe several audio files with concurrent uploads.
+
+        Uploads dominate transcription latency on slow links; overlapping
+        them with AsyncOpenAI multiplies throughput. Concurrency is bounded
+        by a semaphore to stay under rate limits.
+
+        Args:
+            audio_file_paths: Paths to the audio files
+            max_concurrency: Maximum simultaneous uploads
+
+        Returns:
+            One entry per input path, in order: the transcript string, or
+            the exception raised for that file
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def transcribe_one(path: str):
+            async with semaphore:
+                return await self._atranscribe_audio(path)
+
+        return await asyncio.gather(
+            *(transcribe_one(path) for path in audio_file_paths),
+            return_exceptions=True
+        )
+
     def validate_audio_file(self, file_path: str) -> tuple[bool, str]:
         """
         Validate audio file before processing.
@@ -92,16 +439,19 @@ class TranscriptionAgent:
         Returns:
             Tuple of (is_valid, error_message)
         """
-        if not os.path.exists(file_path):
+        # One stat yields existence and size together
+        try:
+            stat = os.stat(file_path)
+        except OSError:
             return False, f"File not found: {file_path}"
-        
+
         file_ext = os.path.splitext(file_path)[1].lower()
-        if file_ext not in Config.SUPPORTED_AUDIO_FORMATS:
+        if file_ext not in _SUPPORTED:
             return False, f"Unsupported format: {file_ext}. Supported: {Config.SUPPORTED_AUDIO_FORMATS}"
-        
+
         # Check file size (Whisper has a 25 MB limit)
-        file_size_mb = os.path.getsize(file_path) / (1024 * 1024)
+        file_size_mb = stat.st_size / (1024 * 1024)
         if file_size_mb > 25:
             return False, f"File too large: {file_size_mb:.2f} MB. Maximum: 25 MB"
-        
+
         return True, ""
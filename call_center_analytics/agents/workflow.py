@@ -1,15 +1,91 @@
 """
 Agent Workflow - Orchestrates all agents using LangGraph with Content Safety.
 """
-from typing import Dict, Any, TypedDict, Annotated, Sequence
-import operator
+from typing import AsyncIterator, Dict, Any, List, Tuple, TypedDict, Annotated, Sequence
+import asyncio
+import hashlib
+import functools
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from langchain.globals import set_llm_cache
+from langchain_community.cache import SQLiteCache
 from langgraph.graph import StateGraph, END
-from agents.call_intake_agent import CallIntakeAgent
-from agents.transcription_agent import TranscriptionAgent
-from agents.content_safety_agent import ContentSafetyAgent
-from agents.summarization_agent import SummarizationAgent
-from agents.quality_scoring_agent import QualityScoringAgent
-from agents.data_storage_agent import DataStorageAgent
+
+# Agent modules are imported lazily inside the node methods: each pulls
+# in its own slice of the OpenAI/LangChain stack, and a text-only run
+# never needs the audio agents (nor vice versa). Deferring the imports
+# cuts cold-start time to roughly the paths a request actually takes.
+
+
+_llm_cache_configured = False
+
+# One persistent event loop for the synchronous entry points. The shared
+# httpx/OpenAI async clients bind their connection pools and locks to the
+# loop that first drives them; an asyncio.run per call would close that
+# loop and leave the process-cached clients holding dead pool state, so
+# every sync-initiated run is funneled onto this loop instead.
+_loop_lock = threading.Lock()
+_loop: Any = None
+
+
+def _pipeline_loop() -> asyncio.AbstractEventLoop:
+    """The process-wide event loop that drives all pipeline runs."""
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_loop.run_forever, name="pipeline-loop", daemon=True
+            ).start()
+    return _loop
+
+
+def _configure_llm_cache() -> None:
+    """
+    Enable LangChain's persistent LLM response cache (once per process).
+
+    Responses are keyed on the full prompt plus model parameters, so
+    reprocessing the same conversation (replays, retries after a parse
+    failure, dev loops) returns the cached completion instead of paying
+    for a duplicate API call.
+    """
+    global _llm_cache_configured
+    if _llm_cache_configured:
+        return
+
+    cache_dir = Path("data_storage_call_center")
+    cache_dir.mkdir(exist_ok=True)
+    set_llm_cache(SQLiteCache(database_path=str(cache_dir / "llm_cache.db")))
+    _llm_cache_configured = True
+
+
+def _extend_steps(existing: Sequence[str], new: Sequence[str]) -> Sequence[str]:
+    """
+    Reducer for processing_steps that extends in place.
+
+    operator.add would copy the accumulated list on every node; extend
+    keeps appends O(len(new)). Each run starts from its own fresh list
+    (see _INITIAL_STATE_TEMPLATE), so the mutation never leaks between
+    runs.
+    """
+    if not new:
+        return existing
+    if existing is None:
+        return list(new)
+    existing = list(existing) if not isinstance(existing, list) else existing
+    existing.extend(new)
+    return existing
+
+
+# Routing truth tables, indexed by a small bitmask of state flags.
+# Each router runs once per superstep; a precomputed table turns the
+# branch chain into one index operation.
+# bit 0: error set, bit 1: content safety failed
+_SAFETY_TABLE = ("continue", "end", "store_flagged", "store_flagged")
+# bit 0: error or validation failure, bit 1: call_data missing
+_INTAKE_TABLE = ("continue", "end", "end", "end")
 
 
 class GraphState(TypedDict):
@@ -20,6 +96,7 @@ class GraphState(TypedDict):
     
     # Intermediate states
     transcript: str
+    transcript_hash: str
     call_data: Any
     summary: Any
     quality_score: Any
@@ -39,7 +116,7 @@ class GraphState(TypedDict):
     content_safety_details: Dict[str, Any]
     
     # Metadata
-    processing_steps: Annotated[Sequence[str], operator.add]
+    processing_steps: Annotated[Sequence[str], _extend_steps]
 
 
 class CallCenterWorkflow:
@@ -48,18 +125,60 @@ class CallCenterWorkflow:
     Handles routing between agents based on input type (text vs audio).
     """
     
+    # Shared initial-state template: one dict.copy() per request instead
+    # of rebuilding (and re-hashing the keys of) a 13-key literal on every
+    # call. processing_steps must be replaced with a fresh list after the
+    # copy - the template's list would otherwise be shared across runs.
+    _INITIAL_STATE_TEMPLATE: Dict[str, Any] = {
+        "input_type": "",
+        "input_content": "",
+        "transcript": None,
+        "transcript_hash": None,
+        "call_data": None,
+        "summary": None,
+        "quality_score": None,
+        "storage_path": None,
+        "error": None,
+        "validation_failed": False,
+        "needs_manual_review": False,
+        "content_safety_passed": True,
+        "content_safety_details": None,
+        "processing_steps": None,
+    }
+
     def __init__(self):
-        """Initialize all agents and build the workflow graph."""
-        # Initialize agents
-        self.transcription_agent = TranscriptionAgent()
-        self.content_safety_agent = ContentSafetyAgent()
-        self.call_intake_agent = CallIntakeAgent()
-        self.summarization_agent = SummarizationAgent()
-        self.quality_scoring_agent = QualityScoringAgent()
-        self.data_storage_agent = DataStorageAgent()
-        
-        # Build the graph
-        self.workflow = self._build_graph()
+        """Bind this instance to the shared agents and compiled graph."""
+        self.__dict__.update(type(self)._shared().__dict__)
+
+    @classmethod
+    @functools.cache
+    def _shared(cls) -> "CallCenterWorkflow":
+        """
+        Build the agents and compile the graph exactly once per process.
+
+        Agent construction opens HTTP connection pools and the graph
+        compile walks the whole StateGraph; constructing a workflow per
+        request (e.g. one per UI interaction) would repeat both. The
+        agents are stateless apart from their caches and the OpenAI
+        clients are thread-safe, so sharing them is safe.
+
+        Returns:
+            The fully initialized prototype instance
+        """
+        # Enable the shared LLM response cache before any agent builds its LLM
+        _configure_llm_cache()
+
+        prototype = object.__new__(cls)
+        prototype.transcription_agent = None
+        prototype.content_safety_agent = None
+        prototype.call_intake_agent = None
+        prototype.analysis_agent = None
+        prototype.data_storage_agent = None
+        # In-flight runs keyed by input hash, for single-flight dedup of
+        # concurrent duplicate submissions (shared across all instances)
+        prototype._inflight = {}
+        prototype.workflow = prototype._build_graph()
+        return prototype
         
     def _build_graph(self) -> StateGraph:
         """
@@ -75,8 +194,7 @@ class CallCenterWorkflow:
         workflow.add_node("transcription", self._transcription_node)
         workflow.add_node("content_safety", self._content_safety_node)
         workflow.add_node("call_intake", self._call_intake_node)
-        workflow.add_node("summarization", self._summarization_node)
-        workflow.add_node("quality_scoring", self._quality_scoring_node)
+        workflow.add_node("analysis", self._analysis_node)
         workflow.add_node("data_storage", self._data_storage_node)
         
         # Set entry point with conditional routing
@@ -89,8 +207,15 @@ class CallCenterWorkflow:
         )
         
         # Add edges
-        # Transcription -> Content Safety (check after transcription)
-        workflow.add_edge("transcription", "content_safety")
+        # Transcription -> Content Safety, unless transcription errored
+        workflow.add_conditional_edges(
+            "transcription",
+            self._route_on_error,
+            {
+                "continue": "content_safety",
+                "end": END
+            }
+        )
         
         # Content Safety -> Conditional (check if content is safe)
         workflow.add_conditional_edges(
@@ -108,30 +233,50 @@ class CallCenterWorkflow:
             "call_intake",
             self._should_continue_after_intake,
             {
-                "continue": "summarization",
+                "continue": "analysis",
                 "end": END
             }
         )
-        
-        # Summarization -> Conditional (check if agent name exists for quality scoring)
+
+        # Analysis (summary + quality score in one LLM call) -> Data Storage,
+        # unless analysis errored
         workflow.add_conditional_edges(
-            "summarization",
-            self._should_do_quality_scoring,
+            "analysis",
+            self._route_on_error,
             {
-                "score": "quality_scoring",
-                "skip": "data_storage"  # Still store data even if scoring skipped
+                "continue": "data_storage",
+                "end": END
             }
         )
         
-        # Quality Scoring -> Data Storage
-        workflow.add_edge("quality_scoring", "data_storage")
-        
         # Data Storage -> END
         workflow.add_edge("data_storage", END)
         
-        # Compile the graph
+        # No checkpointer: every invocation passes a full initial state,
+        # which LangGraph treats as a fresh run from START anyway - a
+        # checkpointer would only replay prior runs' channel values into
+        # the reducers (duplicating processing_steps) and retain every
+        # input's checkpoints for the life of the process. Duplicate
+        # submissions are already collapsed by the single-flight dedup
+        # in process_async and the LLM response cache.
         return workflow.compile()
     
+    def _route_on_error(self, state: Dict[str, Any]) -> str:
+        """
+        Skip straight to END once a node has set the error field.
+
+        Routing on the edge keeps failed runs from scheduling the
+        remaining nodes at all, which is why the node methods no longer
+        carry their own error guards.
+
+        Args:
+            state: Current state
+
+        Returns:
+            "continue" to run the next node, "end" to stop
+        """
+        return "end" if state.get("error") else "continue"
+
     def _route_entry(self, state: Dict[str, Any]) -> str:
         """
         Route to the appropriate entry point based on input type.
@@ -161,17 +306,13 @@ class CallCenterWorkflow:
             "store_flagged" to store flagged content for manual review,
             "end" to stop completely (on error)
         """
-        # If content safety check failed, flag for manual review and store
-        # (Check this FIRST before checking for other errors)
-        if not state.get("content_safety_passed", True):
-            return "store_flagged"
-        
-        # If there's a system error (not content safety issue), stop processing
-        if state.get("error"):
-            return "end"
-        
-        # Otherwise continue to normal call intake
-        return "continue"
+        # Safety failure outranks system errors: flagged content is still
+        # stored for manual review
+        flags = (
+            (not state.get("content_safety_passed", True)) << 1
+            | bool(state.get("error"))
+        )
+        return _SAFETY_TABLE[flags]
     
     def _should_continue_after_intake(self, state: Dict[str, Any]) -> str:
         """
@@ -183,126 +324,202 @@ class CallCenterWorkflow:
         Returns:
             "continue" to proceed with processing, "end" to stop
         """
-        # If there's an error or validation failed, stop processing
-        if state.get("error") or state.get("validation_failed"):
-            return "end"
-        
-        # If call_data is missing, stop processing
-        if not state.get("call_data"):
-            return "end"
-        
-        # Otherwise continue to summarization
-        return "continue"
-    
-    def _should_do_quality_scoring(self, state: Dict[str, Any]) -> str:
-        """
-        Determine if quality scoring should be performed.
-        Always performs quality scoring if call_data exists (even without agent name).
-        
-        Args:
-            state: Current state
-            
-        Returns:
-            "score" to proceed with quality scoring, "skip" to skip
-        """
-        # Check if call_data exists
-        call_data = state.get("call_data")
-        if not call_data:
-            return "skip"
-        
-        # Always proceed with quality scoring (agent name is optional)
-        return "score"
+        flags = (
+            (not state.get("call_data")) << 1
+            | bool(state.get("error") or state.get("validation_failed"))
+        )
+        return _INTAKE_TABLE[flags]
     
-    def _transcription_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
+    # Nodes are async so ainvoke can overlap I/O waits across concurrent
+    # pipeline runs instead of serializing them through the default
+    # threadpool. Agents without a native async path run in a worker
+    # thread via asyncio.to_thread so they still never block the loop.
+
+    async def _transcription_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """
         Execute transcription agent.
-        
+
         Args:
             state: Current state
-            
+
         Returns:
             Updated state
         """
-        if state.get("error"):
-            return state
-        
-        return self.transcription_agent.process(state)
-    
-    def _content_safety_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        if self.transcription_agent is None:
+            from agents.transcription_agent import TranscriptionAgent
+            self.transcription_agent = TranscriptionAgent()
+        if self.content_safety_agent is None:
+            from agents.content_safety_agent import ContentSafetyAgent
+            self.content_safety_agent = ContentSafetyAgent()
+
+        # For long chunked audio, moderate each segment's text while the
+        # remaining segments are still transcribing, then seed the safety
+        # agent's cache so its node becomes a lookup
+        safety = self.content_safety_agent
+        segment_checks = []
+
+        async def moderate_segment(text: str):
+            segment_checks.append(
+                await safety.guardrails.acheck_transcript_safety(text)
+            )
+
+        delta = await self.transcription_agent.aprocess(
+            state, on_segment=moderate_segment
+        )
+
+        transcript = delta.get("transcript")
+        if transcript and segment_checks:
+            from agents.call_intake_agent import compute_transcript_hash
+            safety.seed_moderation_result(
+                compute_transcript_hash(transcript),
+                safety.merge_results(segment_checks)
+            )
+
+        return delta
+
+    async def _content_safety_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """
         Execute content safety agent to check transcript.
-        
+
         Args:
             state: Current state
-            
+
         Returns:
             Updated state with content safety results
         """
-        if state.get("error"):
-            return state
-        
-        return self.content_safety_agent.process(state)
-    
-    def _call_intake_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        if self.content_safety_agent is None:
+            from agents.content_safety_agent import ContentSafetyAgent
+            self.content_safety_agent = ContentSafetyAgent()
+
+        return await self.content_safety_agent.aprocess(state)
+
+    async def _call_intake_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """
         Execute call intake agent.
-        
+
         Args:
             state: Current state
-            
+
         Returns:
             Updated state
         """
-        if state.get("error"):
-            return state
-        
-        return self.call_intake_agent.process(state)
-    
-    def _summarization_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        if self.call_intake_agent is None:
+            from agents.call_intake_agent import CallIntakeAgent
+            self.call_intake_agent = CallIntakeAgent()
+
+        return await self.call_intake_agent.aprocess(state)
+
+    async def _analysis_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Execute summarization agent.
-        
+        Execute analysis agent (summary + quality scoring).
+
         Args:
             state: Current state
-            
+
         Returns:
             Updated state
         """
-        if state.get("error"):
-            return state
-        
-        return self.summarization_agent.process(state)
-    
-    def _quality_scoring_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        if self.analysis_agent is None:
+            from agents.analysis_agent import AnalysisAgent
+            self.analysis_agent = AnalysisAgent()
+
+        return await self.analysis_agent.aprocess(state)
+
+    async def _data_storage_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Execute quality scoring agent.
-        
+        Execute data storage agent.
+
         Args:
             state: Current state
-            
+
         Returns:
             Updated state
         """
-        if state.get("error"):
-            return state
-        
-        return self.quality_scoring_agent.process(state)
+        if self.data_storage_agent is None:
+            from agents.data_storage_agent import DataStorageAgent
+            self.data_storage_agent = DataStorageAgent()
+
+        return await asyncio.to_thread(self.data_storage_agent.process, state)
     
-    def _data_storage_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
+    def _reject_trivial_input(self, input_type: str, input_content: str) -> Dict[str, Any]:
         """
-        Execute data storage agent.
-        
+        Fast-fail obviously invalid input without running the graph.
+
+        Empty text and missing/empty audio files would fail inside the
+        pipeline anyway; catching them here skips the scheduler and the
+        moderation round trip entirely.
+
         Args:
-            state: Current state
-            
+            input_type: Type of input ('text' or 'audio')
+            input_content: Content (file path or text content)
+
         Returns:
-            Updated state
+            A terminal error state, or None if the input looks viable
         """
-        if state.get("error"):
-            return state
-        
-        return self.data_storage_agent.process(state)
-    
+        error = self._validate(input_type, input_content)
+        if error is None:
+            return None
+
+        state = self._make_initial_state(input_type, input_content)
+        state["error"] = error
+        state["validation_failed"] = True
+        return state
+
+    @staticmethod
+    def _validate(input_type: str, input_content: str) -> Any:
+        """
+        Synchronous input validation, cheap enough to run before the
+        graph executor is touched.
+
+        Args:
+            input_type: Type of input ('text' or 'audio')
+            input_content: Content (file path or text content)
+
+        Returns:
+            A user-facing error string, or None if the input is viable
+        """
+        if input_type not in ("text", "audio"):
+            return f"Unsupported input type: {input_type}"
+
+        if input_type == "text":
+            if not input_content or not input_content.strip():
+                return "Empty transcript provided"
+            return None
+
+        if not input_content:
+            return "No audio file path provided"
+        try:
+            size = os.path.getsize(input_content)
+        except OSError:
+            return f"Audio file not found: {input_content}"
+        if size == 0:
+            return f"Audio file is empty: {input_content}"
+        return None
+
+    def _make_initial_state(self, input_type: str, input_content: str) -> Dict[str, Any]:
+        """
+        Build the initial graph state for one run.
+
+        One template copy plus the varying fields; text input seeds the
+        transcript directly so the graph can skip transcription.
+
+        Args:
+            input_type: Type of input ('text' or 'audio')
+            input_content: Content (file path or text content)
+
+        Returns:
+            Fresh initial state dict
+        """
+        initial_state = self._INITIAL_STATE_TEMPLATE.copy()
+        initial_state["input_type"] = input_type
+        initial_state["input_content"] = input_content
+        initial_state["processing_steps"] = []
+
+        if input_type == "text":
+            initial_state["transcript"] = input_content
+
+        return initial_state
+
     def process(self, input_type: str, input_content: str) -> Dict[str, Any]:
         """
         Process input through the entire workflow.
@@ -314,39 +531,89 @@ class CallCenterWorkflow:
         Returns:
             Final state with all results
         """
-        # Initialize state
-        initial_state = {
-            "input_type": input_type,
-            "input_content": input_content,
-            "transcript": None,
-            "call_data": None,
-            "summary": None,
-            "quality_score": None,
-            "storage_path": None,
-            "error": None,
-            "validation_failed": False,
-            "needs_manual_review": False,
-            "content_safety_passed": True,
-            "content_safety_details": {},
-            "processing_steps": []
-        }
-        
-        # For text input, set transcript directly
-        if input_type == "text":
-            initial_state["transcript"] = input_content
+        rejected = self._reject_trivial_input(input_type, input_content)
+        if rejected is not None:
+            return rejected
+
+        initial_state = self._make_initial_state(input_type, input_content)
         
-        # Run the workflow
+        # Run the workflow on the persistent pipeline loop - the shared
+        # async clients stay bound to one live loop across calls
         try:
-            final_state = self.workflow.invoke(initial_state)
+            final_state = asyncio.run_coroutine_threadsafe(
+                self.workflow.ainvoke(initial_state),
+                _pipeline_loop()
+            ).result()
             return final_state
         except Exception as e:
             initial_state["error"] = f"Workflow error: {str(e)}"
             return initial_state
     
+    def run_many(self, transcripts: List[str], max_workers: int = 10) -> List[Dict[str, Any]]:
+        """
+        Process multiple text transcripts concurrently.
+
+        The pipeline is network-bound (LLM and moderation calls), so
+        overlapping runs multiplies throughput. All runs execute as
+        coroutines on the single pipeline loop, which keeps the shared
+        async clients on one loop instead of racing them across threads.
+
+        Args:
+            transcripts: List of transcript texts
+            max_workers: Maximum number of concurrent pipeline runs
+
+        Returns:
+            List of final states in the same order as the input
+        """
+        if not transcripts:
+            return []
+
+        return asyncio.run_coroutine_threadsafe(
+            self.process_many_async(
+                [("text", transcript) for transcript in transcripts],
+                max_concurrency=max_workers
+            ),
+            _pipeline_loop()
+        ).result()
+
+    def submit_batch(
+        self, items: List[Tuple[str, str]], max_concurrency: int = 10
+    ) -> "List[Future]":
+        """
+        Schedule many inputs on the pipeline loop without blocking.
+
+        Sync callers (e.g. the Streamlit batch page) get one
+        concurrent.futures.Future per item, so they can report progress
+        as runs finish while all coroutines share the persistent loop.
+
+        Args:
+            items: (input_type, input_content) pairs
+            max_concurrency: Maximum simultaneous pipeline runs
+
+        Returns:
+            One Future per item, in input order
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def process_one(input_type: str, input_content: str):
+            async with semaphore:
+                return await self.process_async(input_type, input_content)
+
+        loop = _pipeline_loop()
+        return [
+            asyncio.run_coroutine_threadsafe(process_one(t, c), loop)
+            for t, c in items
+        ]
+
     async def process_async(self, input_type: str, input_content: str) -> Dict[str, Any]:
         """
         Process input through the entire workflow asynchronously.
-        
+
+        Identical submissions arriving while a run is already in flight
+        (replays, double-clicks, retry storms) await the first run's
+        future instead of paying for a second pass through the LLM
+        pipeline.
+
         Args:
             input_type: Type of input ('text' or 'audio')
             input_content: Content (file path or text content)
@@ -354,31 +621,91 @@ class CallCenterWorkflow:
         Returns:
             Final state with all results
         """
-        # Initialize state
-        initial_state = {
-            "input_type": input_type,
-            "input_content": input_content,
-            "transcript": None,
-            "call_data": None,
-            "summary": None,
-            "quality_score": None,
-            "storage_path": None,
-            "error": None,
-            "validation_failed": False,
-            "needs_manual_review": False,
-            "content_safety_passed": True,
-            "content_safety_details": {},
-            "processing_steps": []
-        }
-        
-        # For text input, set transcript directly
-        if input_type == "text":
-            initial_state["transcript"] = input_content
+        rejected = self._reject_trivial_input(input_type, input_content)
+        if rejected is not None:
+            return rejected
+
+        key = hashlib.blake2b(
+            f"{input_type}|{input_content}".encode("utf-8"), digest_size=16
+        ).hexdigest()
+
+        # Single-flight: piggyback on an identical in-flight run
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await pending
+
+        future: "asyncio.Future[Dict[str, Any]]" = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+
+        initial_state = self._make_initial_state(input_type, input_content)
         
         # Run the workflow
         try:
-            final_state = await self.workflow.ainvoke(initial_state)
+            try:
+                final_state = await self.workflow.ainvoke(initial_state)
+            except Exception as e:
+                initial_state["error"] = f"Workflow error: {str(e)}"
+                final_state = initial_state
+            future.set_result(final_state)
             return final_state
-        except Exception as e:
-            initial_state["error"] = f"Workflow error: {str(e)}"
-            return initial_state
+        finally:
+            del self._inflight[key]
+            # Task cancellation raises BaseException past the handler
+            # above; cancel the future too so piggybacked duplicate
+            # callers are released instead of awaiting forever
+            if not future.done():
+                future.cancel()
+
+    async def process_many_async(
+        self, items: List[Tuple[str, str]], max_concurrency: int = 16
+    ) -> List[Any]:
+        """
+        Process many inputs concurrently on one event loop.
+
+        The pipeline is I/O-bound, so overlapping runs multiplies
+        throughput until the provider rate limit; the semaphore keeps
+        concurrency below it. Single-flight dedup in process_async means
+        duplicate items in the same batch share one pipeline run.
+
+        Args:
+            items: (input_type, input_content) pairs
+            max_concurrency: Maximum simultaneous pipeline runs
+
+        Returns:
+            One entry per item, in order: the final state, or the
+            exception raised for that item
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def process_one(input_type: str, input_content: str):
+            async with semaphore:
+                return await self.process_async(input_type, input_content)
+
+        return await asyncio.gather(
+            *(process_one(input_type, content) for input_type, content in items),
+            return_exceptions=True
+        )
+
+    async def process_stream(
+        self, input_type: str, input_content: str
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process input and yield per-node state updates as they complete.
+
+        UI callers can render the transcript and content-safety verdict
+        as soon as those nodes finish, while analysis and storage are
+        still running, instead of waiting for the whole graph.
+
+        Args:
+            input_type: Type of input ('text' or 'audio')
+            input_content: Content (file path or text content)
+
+        Yields:
+            {node_name: state_delta} dicts in execution order
+        """
+        initial_state = self._make_initial_state(input_type, input_content)
+
+        async for event in self.workflow.astream(
+            initial_state, stream_mode="updates"
+        ):
+            yield event
@@ -4,6 +4,10 @@ Run this after installing dependencies to ensure everything works.
 """
 import sys
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from importlib.util import find_spec
+from io import StringIO
 
 
 def test_imports():
@@ -22,10 +26,11 @@ def test_imports():
     
     failed = []
     for module, package in required_packages:
-        try:
-            __import__(module)
+        # find_spec confirms the package is installed without executing
+        # its top-level code - much faster than importing the full stack
+        if find_spec(module) is not None:
             print(f"  ✅ {package}")
-        except ImportError:
+        else:
             print(f"  ❌ {package}")
             failed.append(package)
     
@@ -183,20 +188,72 @@ def test_workflow():
         return False
 
 
+class _ThreadLocalStdout:
+    """
+    Stdout stand-in that routes each thread's writes to its own buffer.
+
+    contextlib.redirect_stdout swaps sys.stdout process-wide, so parallel
+    tests would clobber each other's capture; this keeps one buffer per
+    worker thread and falls back to the real stream otherwise.
+    """
+
+    def __init__(self, fallback):
+        self._fallback = fallback
+        self._local = threading.local()
+
+    def attach(self, buffer):
+        self._local.buffer = buffer
+
+    def write(self, text):
+        target = getattr(self._local, "buffer", None) or self._fallback
+        target.write(text)
+
+    def flush(self):
+        target = getattr(self._local, "buffer", None) or self._fallback
+        target.flush()
+
+
+def _run_buffered(test_fn, capture):
+    """Run one test with its stdout buffered, so parallel runs don't interleave."""
+    buffer = StringIO()
+    capture.attach(buffer)
+    try:
+        passed = test_fn()
+    finally:
+        capture.attach(None)
+    return passed, buffer.getvalue()
+
+
 def main():
     """Run all tests."""
     print("\n" + "="*60)
     print("  Call Center AI Assistant - Setup Verification")
     print("="*60 + "\n")
     
-    results = []
+    # The tests are independent, so run them concurrently - total time is
+    # bounded by the slowest (the LLM workflow test) instead of the sum.
+    # Each test's output is buffered and flushed in the original order.
+    tests = [
+        ("Imports", test_imports),
+        ("Configuration", test_config),
+        ("Agents", test_agents),
+        ("Sample Data", test_sample_data),
+        ("Workflow", test_workflow),
+    ]
+    
+    capture = _ThreadLocalStdout(sys.stdout)
+    sys.stdout = capture
+    try:
+        with ThreadPoolExecutor(max_workers=len(tests)) as executor:
+            futures = [executor.submit(_run_buffered, fn, capture) for _, fn in tests]
+            outcomes = [future.result() for future in futures]
+    finally:
+        sys.stdout = capture._fallback
     
-    # Run tests
-    results.append(("Imports", test_imports()))
-    results.append(("Configuration", test_config()))
-    results.append(("Agents", test_agents()))
-    results.append(("Sample Data", test_sample_data()))
-    results.append(("Workflow", test_workflow()))
+    results = []
+    for (test_name, _), (passed, output) in zip(tests, outcomes):
+        print(output, end="")
+        results.append((test_name, passed))
     
     # Summary
     print("="*60)
@@ -1,22 +1,29 @@
 """
 Initialize utils package.
+
+Exports are loaded lazily (PEP 562): importing utils no longer pulls in
+pydantic and dotenv until a consumer actually touches a model or Config.
 """
-from utils.models import (
-    CallMetadata,
-    ConversationTurn,
-    CallData,
-    CallSummary,
-    QualityScore,
-    AgentState
-)
-from utils.config import Config
 
-__all__ = [
-    'CallMetadata',
-    'ConversationTurn',
-    'CallData',
-    'CallSummary',
-    'QualityScore',
-    'AgentState',
-    'Config'
-]
+_EXPORTS = {
+    'CallMetadata': 'utils.models',
+    'ConversationTurn': 'utils.models',
+    'CallData': 'utils.models',
+    'CallSummary': 'utils.models',
+    'QualityScore': 'utils.models',
+    'AgentState': 'utils.models',
+    'Config': 'utils.config',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    try:
+        module_name = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    value = getattr(import_module(module_name), name)
+    globals()[name] = value  # cache for subsequent lookups
+    return value
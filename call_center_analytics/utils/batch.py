@@ -0,0 +1,83 @@
+"""
+Shared helpers for the OpenAI Batch API (50% cheaper offline processing).
+"""
+import io
+import time
+from typing import Dict, List
+
+import orjson
+
+
+def build_chat_request(custom_id: str, prompt: str, model: str,
+                       temperature: float = 0.1) -> str:
+    """
+    Serialize one /v1/chat/completions request line for a batch upload.
+
+    Args:
+        custom_id: Identifier echoed back in the batch output
+        prompt: User message content
+        model: Model name
+        temperature: Sampling temperature
+
+    Returns:
+        JSONL-ready request line
+    """
+    return orjson.dumps({
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": "/v1/chat/completions",
+        "body": {
+            "model": model,
+            "temperature": temperature,
+            "messages": [{"role": "user", "content": prompt}]
+        }
+    }).decode("utf-8")
+
+
+def run_chat_batch(client, request_lines: List[str],
+                   poll_interval: int = 30) -> Dict[str, str]:
+    """
+    Submit JSONL request lines to the OpenAI Batch API and collect responses.
+
+    Uploads the lines as a batch input file, polls until the batch reaches a
+    terminal status, then downloads and parses the output file.
+
+    Args:
+        client: OpenAI client
+        request_lines: Serialized /v1/chat/completions request objects
+        poll_interval: Seconds between batch status polls
+
+    Returns:
+        Mapping of custom_id to response message content
+
+    Raises:
+        RuntimeError: If the batch ends in any status other than completed
+    """
+    batch_file = client.files.create(
+        file=io.BytesIO("\n".join(request_lines).encode("utf-8")),
+        purpose="batch"
+    )
+    batch = client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+
+    while batch.status not in ("completed", "failed", "expired", "cancelled"):
+        time.sleep(poll_interval)
+        batch = client.batches.retrieve(batch.id)
+
+    if batch.status != "completed":
+        raise RuntimeError(f"Batch {batch.id} ended with status: {batch.status}")
+
+    output = client.files.content(batch.output_file_id)
+    responses = {}
+    for line in output.text.splitlines():
+        if not line.strip():
+            continue
+        entry = orjson.loads(line)
+        body = (entry.get("response") or {}).get("body") or {}
+        choices = body.get("choices") or []
+        if choices:
+            responses[entry["custom_id"]] = choices[0]["message"]["content"]
+    return responses
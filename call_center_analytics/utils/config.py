@@ -2,36 +2,47 @@
 Configuration settings for the Call Center AI Assistant system.
 """
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+
+@lru_cache(maxsize=1)
+def _load_env() -> bool:
+    """
+    Parse the .env file exactly once per process.
+
+    Streamlit reruns and test imports re-trigger imports of this
+    module's dependents; the lru_cache makes repeat calls a dict lookup
+    instead of re-reading and re-parsing the file.
+    """
+    load_dotenv()
+    return True
+
+
+# Load environment variables (cached)
+_load_env()
 
 
 class Config:
     """Configuration class for the application."""
-    
+
     # API Keys
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-    
+
     # Model Configuration
     GPT_MODEL = os.getenv("GPT_MODEL", "gpt-4")
     WHISPER_MODEL = os.getenv("WHISPER_MODEL", "whisper-1")
-    
+
     # Temperature settings
     TEMPERATURE = 0.3  # Lower temperature for more consistent outputs
-    
+
     # Supported file formats
     SUPPORTED_AUDIO_FORMATS = [".wav", ".mp3", ".m4a", ".flac", ".ogg"]
     SUPPORTED_TEXT_FORMATS = [".txt"]
-    
+
     @classmethod
     def validate(cls):
         """Validate that required configuration is present."""
         if not cls.OPENAI_API_KEY:
             raise ValueError("OPENAI_API_KEY is not set. Please check your .env file.")
         return True
-
-
-# Validate configuration on import
-Config.validate()
@@ -4,9 +4,48 @@ Content Safety Guardrails Module
 This module provides Content Safety checking using OpenAI's Moderation API
 to detect inappropriate content in transcribed call text.
 """
-from typing import Dict, Any, Tuple
-from openai import OpenAI
+import re
+from typing import Dict, Any, List, Tuple
 from utils.config import Config
+from utils.llm import shared_openai_client, shared_async_openai_client
+
+
+# Local prefilter: most call-center transcripts are benign, and a single
+# compiled regex pass can prove that in microseconds. Short transcripts
+# with no risk-token or PII hits skip the moderation RPC entirely; any
+# hit (or a long transcript) escalates to the API, which stays the
+# trusted decision authority.
+_RISK_TOKENS = (
+    "kill", "murder", "shoot", "stab", "bomb", "attack", "assault",
+    "threat", "hurt you", "hate", "racist", "abuse", "harass",
+    "suicide", "self-harm", "die", "weapon", "gun", "knife",
+    "fuck", "shit", "bitch", "bastard", "asshole", "damn you",
+    "sex", "naked", "porn",
+)
+_RISK_RE = re.compile(
+    r"\b(?:" + "|".join(re.escape(token) for token in _RISK_TOKENS) + r")",
+    re.IGNORECASE,
+)
+# PII patterns worth a closer look: SSN-shaped and long card-like digit runs
+_PII_RE = re.compile(r"\b\d{3}-\d{2}-\d{4}\b|\b\d{13,16}\b")
+# Long transcripts always go to the API - too much surface for a token list
+_PREFILTER_MAX_CHARS = 2000
+
+
+def _prefilter_clean(text: str) -> bool:
+    """True if the text is short and has no risk-token or PII hits."""
+    return (
+        len(text) <= _PREFILTER_MAX_CHARS
+        and _RISK_RE.search(text) is None
+        and _PII_RE.search(text) is None
+    )
+
+
+# Shared verdicts for the overwhelmingly common "safe" outcome. Callers
+# only ever read these; violations are recorded into fresh dicts, so the
+# safe path costs zero allocations per call. Treat as immutable.
+_SAFE_RESULT = (True, {"flagged": False, "categories": (), "all_scores": {}})
+_PREFILTER_SAFE_RESULT = (True, {"flagged": False, "categories": (), "prefilter": "clean"})
 
 
 class GuardrailViolation(Exception):
@@ -25,7 +64,8 @@ class ContentSafetyGuardrails:
     """
     
     def __init__(self):
-        self.client = OpenAI(api_key=Config.OPENAI_API_KEY)
+        self.client = shared_openai_client()
+        self.aclient = shared_async_openai_client()
         self.flagged_categories = []
     
     def check_content(self, text: str, strict_mode: bool = False) -> Tuple[bool, Dict[str, Any]]:
@@ -39,39 +79,199 @@ class ContentSafetyGuardrails:
         Returns:
             Tuple of (is_safe, details_dict)
         """
+        # Obviously-clean short transcripts skip the moderation round trip
+        if not strict_mode and _prefilter_clean(text):
+            return _PREFILTER_SAFE_RESULT
+
         try:
             response = self.client.moderations.create(input=text)
-            result = response.results[0]
-            
-            # Get flagged categories
-            flagged = []
-            for category, is_flagged in result.categories.model_dump().items():
-                if is_flagged:
-                    flagged.append(category)
-            
-            # In strict mode, also check category scores against lower thresholds
-            if strict_mode and not flagged:
-                scores = result.category_scores.model_dump()
-                for category, score in scores.items():
-                    if score > 0.1:  # Lower threshold for strict mode
-                        flagged.append(f"{category}_warning")
-            
-            is_safe = not bool(flagged)
-            
-            details = {
-                "flagged": result.flagged,
-                "categories": flagged,
-                "all_scores": result.category_scores.model_dump() if not is_safe else {}
-            }
-            
-            self.flagged_categories = flagged
-            return is_safe, details
+            return self._interpret_result(response.results[0], strict_mode)
             
         except Exception as e:
             # If moderation check fails, log error but don't block processing
             print(f"Moderation check failed: {e}")
             return True, {"error": str(e), "check_failed": True}
 
+    def _interpret_result(self, result, strict_mode: bool) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Turn one moderation API result into the (is_safe, details) pair
+        shared by the sync and async paths.
+
+        Args:
+            result: Moderation result object from the API
+            strict_mode: If True, flag content with lower thresholds
+
+        Returns:
+            Tuple of (is_safe, details_dict)
+        """
+        # Iterate the model's field dict directly instead of materializing
+        # a model_dump() copy just to read it
+        flagged = []
+        for category, is_flagged in result.categories.__dict__.items():
+            if is_flagged:
+                flagged.append(category)
+
+        # In strict mode, also check category scores against lower thresholds
+        if strict_mode and not flagged:
+            for category, score in result.category_scores.__dict__.items():
+                if score > 0.1:  # Lower threshold for strict mode
+                    flagged.append(f"{category}_warning")
+
+        # The safe verdict is the common case: return the shared constant
+        # instead of building a fresh details dict per call
+        if not flagged and not result.flagged:
+            self.flagged_categories = []
+            return _SAFE_RESULT
+
+        details = {
+            "flagged": result.flagged,
+            "categories": flagged,
+            "all_scores": result.category_scores.model_dump()
+        }
+
+        self.flagged_categories = flagged
+        return not flagged, details
+
+    def check_content_batch(self, texts: List[str], strict_mode: bool = False) -> List[Tuple[bool, Dict[str, Any]]]:
+        """
+        Check several texts with a single moderation request.
+
+        The moderation endpoint accepts a list input, so N transcript
+        chunks (or N separate transcripts) cost one HTTPS round trip
+        instead of N.
+
+        Args:
+            texts: Texts to check
+            strict_mode: If True, flag content with lower thresholds
+
+        Returns:
+            One (is_safe, details_dict) pair per input text, in order
+        """
+        if not texts:
+            return []
+
+        try:
+            response = self.client.moderations.create(input=texts)
+            return [
+                self._interpret_result(result, strict_mode)
+                for result in response.results
+            ]
+
+        except Exception as e:
+            # If moderation check fails, log error but don't block processing
+            print(f"Moderation check failed: {e}")
+            return [(True, {"error": str(e), "check_failed": True}) for _ in texts]
+
+    async def acheck_content_batch(self, texts: List[str], strict_mode: bool = False) -> List[Tuple[bool, Dict[str, Any]]]:
+        """
+        Async counterpart of check_content_batch: several texts, one
+        moderation round trip.
+
+        Args:
+            texts: Texts to check
+            strict_mode: If True, flag content with lower thresholds
+
+        Returns:
+            One (is_safe, details_dict) pair per input text, in order
+        """
+        if not texts:
+            return []
+
+        try:
+            response = await self.aclient.moderations.create(input=texts)
+            return [
+                self._interpret_result(result, strict_mode)
+                for result in response.results
+            ]
+
+        except Exception as e:
+            # If moderation check fails, log error but don't block processing
+            print(f"Moderation check failed: {e}")
+            return [(True, {"error": str(e), "check_failed": True}) for _ in texts]
+
+    async def acheck_content(self, text: str, strict_mode: bool = False) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Async counterpart of check_content, so callers can overlap the
+        moderation round trip with other pipeline I/O.
+
+        Args:
+            text: Transcribed text to check
+            strict_mode: If True, flag content with lower thresholds
+
+        Returns:
+            Tuple of (is_safe, details_dict)
+        """
+        # Obviously-clean short transcripts skip the moderation round trip
+        if not strict_mode and _prefilter_clean(text):
+            return _PREFILTER_SAFE_RESULT
+
+        try:
+            response = await self.aclient.moderations.create(input=text)
+            return self._interpret_result(response.results[0], strict_mode)
+
+        except Exception as e:
+            # If moderation check fails, log error but don't block processing
+            print(f"Moderation check failed: {e}")
+            return True, {"error": str(e), "check_failed": True}
+
+
+# Transcripts longer than this are split on paragraph boundaries and
+# moderated as one batched request (one round trip, N results)
+_MODERATION_CHUNK_CHARS = 8000
+
+
+def _chunk_transcript(transcript: str) -> List[str]:
+    """
+    Split a long transcript into moderation-sized chunks on paragraph
+    boundaries, packing paragraphs greedily up to the chunk limit.
+
+    Args:
+        transcript: Full transcript text
+
+    Returns:
+        List of chunks covering the transcript
+    """
+    chunks = []
+    current: List[str] = []
+    current_len = 0
+
+    for paragraph in transcript.split("\n\n"):
+        if current and current_len + len(paragraph) > _MODERATION_CHUNK_CHARS:
+            chunks.append("\n\n".join(current))
+            current = []
+            current_len = 0
+        current.append(paragraph)
+        current_len += len(paragraph) + 2
+
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+# Transcripts shorter than this (after stripping) skip moderation: empty
+# strings and bare greetings cannot meaningfully violate content policy
+_MIN_MODERATION_CHARS = 20
+
+
+# Shared aggregate verdict for transcripts with no violations. Read-only;
+# _record_violation only ever mutates a fresh dict from _fresh_results()
+_PASSED_RESULT = {
+    "passed": True,
+    "violations": (),
+    "warnings": (),
+    "flagged_categories": ()
+}
+
+
+def _fresh_results() -> Dict[str, Any]:
+    """Mutable results dict for transcripts that did trip a check."""
+    return {
+        "passed": True,
+        "violations": [],
+        "warnings": [],
+        "flagged_categories": []
+    }
+
 
 class GuardrailsManager:
     """
@@ -105,23 +305,98 @@ class GuardrailsManager:
         Returns:
             Dictionary with check results
         """
-        results = {
-            "passed": True,
-            "violations": [],
-            "warnings": [],
-            "flagged_categories": []
-        }
-        
+        # Trivially short transcripts cannot be flagged - skip the API call
+        if len(transcript.strip()) < _MIN_MODERATION_CHARS:
+            return _PASSED_RESULT
+
+        # A results dict is only allocated once a check actually fails;
+        # the common clean transcript returns the shared passed verdict
+        results = None
+
         # Content safety check
+        check_failed = False
         if self.config["content_safety"] and self.content_safety:
-            is_safe, details = self.content_safety.check_content(transcript)
-            if not is_safe:
-                results["passed"] = False
-                results["flagged_categories"] = details.get("categories", [])
-                results["violations"].append({
-                    "type": "content_safety",
-                    "message": "Transcript contains inappropriate content",
-                    "details": details
-                })
-        
-        return results
+            if len(transcript) > _MODERATION_CHUNK_CHARS:
+                # One batched request covering all chunks of a long call
+                checks = self.content_safety.check_content_batch(
+                    _chunk_transcript(transcript)
+                )
+                for is_safe, details in checks:
+                    check_failed |= details.get("check_failed", False)
+                    if not is_safe:
+                        results = results or _fresh_results()
+                        self._record_violation(results, details)
+            else:
+                is_safe, details = self.content_safety.check_content(transcript)
+                check_failed = details.get("check_failed", False)
+                if not is_safe:
+                    results = _fresh_results()
+                    self._record_violation(results, details)
+
+        # A failed API check passes the call through, but the verdict is
+        # provisional - mark it so callers don't cache it as "safe"
+        if check_failed:
+            results = results or _fresh_results()
+            results["check_failed"] = True
+
+        return results if results is not None else _PASSED_RESULT
+
+    async def acheck_transcript_safety(self, transcript: str) -> Dict[str, Any]:
+        """
+        Async counterpart of check_transcript_safety.
+
+        Args:
+            transcript: Transcribed text to check
+
+        Returns:
+            Dictionary with check results
+        """
+        # Trivially short transcripts cannot be flagged - skip the API call
+        if len(transcript.strip()) < _MIN_MODERATION_CHARS:
+            return _PASSED_RESULT
+
+        # A results dict is only allocated once a check actually fails;
+        # the common clean transcript returns the shared passed verdict
+        results = None
+
+        check_failed = False
+        if self.config["content_safety"] and self.content_safety:
+            if len(transcript) > _MODERATION_CHUNK_CHARS:
+                # One batched request covering all chunks of a long call -
+                # oversized single inputs would be rejected by the API and
+                # the transcript would sail through unmoderated
+                checks = await self.content_safety.acheck_content_batch(
+                    _chunk_transcript(transcript)
+                )
+                for is_safe, details in checks:
+                    check_failed |= details.get("check_failed", False)
+                    if not is_safe:
+                        results = results or _fresh_results()
+                        self._record_violation(results, details)
+            else:
+                is_safe, details = await self.content_safety.acheck_content(transcript)
+                check_failed = details.get("check_failed", False)
+                if not is_safe:
+                    results = _fresh_results()
+                    self._record_violation(results, details)
+
+        # A failed API check passes the call through, but the verdict is
+        # provisional - mark it so callers don't cache it as "safe"
+        if check_failed:
+            results = results or _fresh_results()
+            results["check_failed"] = True
+
+        return results if results is not None else _PASSED_RESULT
+
+    @staticmethod
+    def _record_violation(results: Dict[str, Any], details: Dict[str, Any]) -> None:
+        """Mark a results dict as failed, aggregating flagged categories."""
+        results["passed"] = False
+        for category in details.get("categories", []):
+            if category not in results["flagged_categories"]:
+                results["flagged_categories"].append(category)
+        results["violations"].append({
+            "type": "content_safety",
+            "message": "Transcript contains inappropriate content",
+            "details": details
+        })
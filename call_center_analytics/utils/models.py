@@ -1,6 +1,7 @@
 """
 Shared data models for the Call Center AI Assistant system.
 """
+from dataclasses import dataclass, field
 from typing import Optional, List, Dict, Any
 from pydantic import BaseModel, Field
 from datetime import datetime
@@ -15,24 +16,32 @@ class CallMetadata(BaseModel):
     date_time: Optional[str] = Field(None, description="Date and time of the call")
 
 
-class ValidationAndMetadata(BaseModel):
-    """Combined validation result and metadata extraction."""
-    is_valid: bool = Field(..., description="Whether this is a valid call center conversation")
-    validation_reason: str = Field(..., description="Explanation of why valid or invalid")
-    metadata: Optional[CallMetadata] = Field(None, description="Extracted metadata (only if valid)")
-    
-    
 class ConversationTurn(BaseModel):
     """A single turn in the conversation."""
     speaker: str = Field(..., description="Speaker role (Agent/Caller/Customer)")
     text: str = Field(..., description="What was said")
 
 
-class CallData(BaseModel):
-    """Complete call data with metadata and conversation."""
+class ValidationAndMetadata(BaseModel):
+    """Combined validation result, metadata extraction, and parsed conversation."""
+    is_valid: bool = Field(..., description="Whether this is a valid call center conversation")
+    validation_reason: str = Field(..., description="Explanation of why valid or invalid")
+    metadata: Optional[CallMetadata] = Field(None, description="Extracted metadata (only if valid)")
+    conversation: Optional[str] = Field(None, description="Full conversation text (only if valid)")
+    turns: List[ConversationTurn] = Field(default_factory=list, description="Parsed conversation turns (only if valid)")
+
+
+@dataclass(slots=True)
+class CallData:
+    """
+    Complete call data with metadata and conversation.
+
+    Built internally from already-validated components, so a slotted
+    dataclass avoids per-field pydantic validation on the hot path.
+    """
     metadata: CallMetadata
-    conversation: str = Field(..., description="Full conversation text")
-    conversation_turns: List[ConversationTurn] = Field(default_factory=list, description="Parsed conversation turns")
+    conversation: str
+    conversation_turns: List[ConversationTurn] = field(default_factory=list)
 
 
 class CallSummary(BaseModel):
@@ -56,26 +65,45 @@ class QualityScore(BaseModel):
     areas_for_improvement: List[str] = Field(default_factory=list, description="Areas needing improvement")
 
 
-class AgentState(BaseModel):
-    """State object passed between agents in the LangGraph."""
+class CallAnalysis(BaseModel):
+    """Combined summary and quality score produced by a single LLM call."""
+    summary: CallSummary = Field(..., description="Call summary")
+    quality_score: Optional[QualityScore] = Field(None, description="Quality evaluation (null if not scorable)")
+
+
+class BatchCallAnalysis(CallAnalysis):
+    """CallAnalysis tagged with its position in a batched multi-call prompt."""
+    call_index: int = Field(..., description="1-based index of the call this analysis belongs to")
+
+
+class BatchAnalysisResult(BaseModel):
+    """Array of analyses returned for a batched multi-call prompt."""
+    analyses: List[BatchCallAnalysis] = Field(..., description="One analysis per call")
+
+
+@dataclass(slots=True)
+class AgentState:
+    """
+    State object passed between agents in the LangGraph.
+
+    Internal-only (the graph itself uses a TypedDict), so a slotted
+    dataclass skips validation and keeps per-instance memory down.
+    """
     # Input
-    input_type: str = Field(..., description="Type of input: 'text' or 'audio'")
-    input_content: str = Field(..., description="File path or content")
-    
+    input_type: str
+    input_content: str
+
     # Intermediate states
     transcription: Optional[str] = None
     call_data: Optional[CallData] = None
     summary: Optional[CallSummary] = None
     quality_score: Optional[QualityScore] = None
-    
+
     # Quality and review flags
-    needs_manual_review: Optional[bool] = Field(False, description="Flag indicating call needs manual review")
-    
+    needs_manual_review: bool = False
+
     # Error handling
     error: Optional[str] = None
-    
+
     # Metadata
-    processing_steps: List[str] = Field(default_factory=list, description="Steps completed")
-    
-    class Config:
-        arbitrary_types_allowed = True
+    processing_steps: List[str] = field(default_factory=list)
@@ -0,0 +1,28 @@
+"""
+Output parsers shared by the agents.
+
+OrjsonPydanticParser swaps the stdlib json decode inside
+PydanticOutputParser.parse for orjson's C decoder on the common case
+(the model returns bare JSON). Responses are only a few KB each, but
+the parse+validate cycle runs once per LLM call, so the 3-10x faster
+decode is measurable under sustained throughput.
+"""
+import orjson
+from langchain.output_parsers import PydanticOutputParser
+
+
+class OrjsonPydanticParser(PydanticOutputParser):
+    """
+    PydanticOutputParser with an orjson fast path.
+
+    Bare JSON responses are decoded with orjson and validated directly
+    via model_validate. Anything orjson rejects (markdown fences,
+    truncated output) falls back to the base parser, which handles
+    fence stripping and partial JSON.
+    """
+
+    def parse(self, text: str):
+        try:
+            return self.pydantic_object.model_validate(orjson.loads(text))
+        except Exception:
+            return super().parse(text)
@@ -0,0 +1,75 @@
+"""
+Small in-process result cache for per-transcript agent outputs.
+
+Replays, retries, and near-duplicate uploads feed the same transcript
+through the pipeline repeatedly; caching moderation and analysis
+results by content hash turns those repeats into dictionary lookups
+instead of network round trips.
+"""
+import hashlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+def result_key(text: str, *extra: str) -> str:
+    """
+    Cache key for an agent result: blake2b over whitespace-normalized
+    text plus any distinguishing parts (model id, rubric version).
+
+    Args:
+        text: Input text (transcript or conversation)
+        *extra: Additional key components, e.g. the model name
+
+    Returns:
+        Hex digest string
+    """
+    normalized = " ".join(text.split())
+    digest = hashlib.blake2b(normalized.encode("utf-8"), digest_size=16)
+    for part in extra:
+        digest.update(b"|")
+        digest.update(part.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Bounded LRU cache with hit-rate accounting.
+
+    Not thread-safe in the strict sense, but all operations are single
+    dict/OrderedDict calls, so concurrent use from the thread-pool
+    pipeline at worst loses an entry - never corrupts one.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, Any]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss."""
+        try:
+            value = self._data[key]
+        except KeyError:
+            self._misses += 1
+            return None
+        self._data.move_to_end(key)
+        self._hits += 1
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Store value under key, evicting the least recently used entry."""
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counts and current size, for tuning and dashboards."""
+        total = self._hits + self._misses
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "size": len(self._data),
+            "hit_rate": (self._hits / total) if total else 0.0,
+        }